@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the filename and metadata helpers of the original YouTube Downloader
+"""
+
+import sys
+
+import pytest
+
+from yt_downloader import YtDlpLogger, extract_metadata, sanitize_filename, unique_filename
+
+@pytest.mark.parametrize("existing_names, expected", [
+    (set(), "song.mp3"),
+    ({"song.mp3"}, "song_1.mp3"),
+    ({"song.mp3", "song_1.mp3", "song_2.mp3"}, "song_3.mp3"),
+    ({"song_1.mp3"}, "song.mp3"),
+    ({"song.webm"}, "song.mp3")
+])
+def test_unique_filename(existing_names, expected):
+    """Test that the first free name is picked, numbering from _1."""
+    assert unique_filename("song", ".mp3", existing_names) == expected
+
+def test_unique_filename_reservations():
+    """Test that names reserved by earlier queued downloads are skipped too."""
+    existing_names = set()
+    for expected in ("song.mp3", "song_1.mp3", "song_2.mp3"):
+        name = unique_filename("song", ".mp3", existing_names)
+        existing_names.add(name)
+        assert name == expected
+
+@pytest.mark.parametrize("name, expected", [
+    ("Artist - Song", "Artist - Song"),
+    ("AC/DC: Back in Black?", "AC_DC_ Back in Black_"),
+    ("file.name_v2", "file.name_v2")
+])
+def test_sanitize_filename(name, expected):
+    """Test that characters not allowed in filenames become underscores."""
+    assert sanitize_filename(name) == expected
+
+@pytest.mark.parametrize("title, expected", [
+    ("Rick Astley - Never Gonna Give You Up", ("Rick Astley", "Never Gonna Give You Up")),
+    ("Artist - Song - Live", ("Artist", "Song - Live")),
+    ("No separator here", ("Unknown Artist", "No separator here"))
+])
+def test_extract_metadata(title, expected):
+    """Test splitting a video title into artist and song."""
+    assert extract_metadata(title) == expected
+
+def test_quiet_logger_keeps_failure_tail(capsys):
+    """Test that queued (non-verbose) downloads print nothing but keep the last errors."""
+    ydl_logger = YtDlpLogger(max_lines=2)
+    ydl_logger.debug("debug line")
+    ydl_logger.info("info line")
+    ydl_logger.progress_hook({'status': 'downloading', 'downloaded_bytes': 50, 'total_bytes': 200})
+    for message in ("first warning", "second warning", "final error"):
+        ydl_logger.warning(message)
+
+    assert capsys.readouterr() == ("", "")
+    assert ydl_logger.failure_message() == "second warning\nfinal error\nStopped at 25.0%"
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"] + sys.argv[1:]))
@@ -3,10 +3,22 @@ import webbrowser
 import subprocess
 import sys
 import re
-import pip
-from googleapiclient.discovery import build
+import functools
+import itertools
+import threading
+import importlib.util
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from termcolor import colored
-from mutagen.easyid3 import EasyID3
+
+# Characters that are not allowed in saved filenames
+INVALID_FILENAME_CHARS = re.compile(r'[^\w\-_\. ]')
+
+# Fetch HLS/DASH fragments in parallel and split large files into resumable chunks
+YDL_TRANSFER_OPTS = {
+    'concurrent_fragment_downloads': 8,
+    'http_chunk_size': 10 * 1024 * 1024
+}
 
 # Function to install missing dependencies
 def install_dependencies():
@@ -19,56 +31,39 @@ def install_dependencies():
     }
     
     print(colored("Checking and installing dependencies...", 'yellow'))
+    missing = []
     for package_name, import_name in packages.items():
         try:
             __import__(import_name)
             print(colored(f"{package_name} is already installed.", 'green'))
         except ImportError:
-            print(colored(f"{package_name} not found. Attempting to install...", 'yellow'))
-            try:
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', package_name])
-                print(colored(f"Successfully installed {package_name}.", 'green'))
-            except subprocess.CalledProcessError as e:
-                print(colored(f"Failed to install {package_name}: {str(e)}. Please install it manually.", 'red'))
-                print(colored(f"Run: pip install {package_name}", 'red'))
-                sys.exit(1)
+            print(colored(f"{package_name} not found.", 'yellow'))
+            missing.append(package_name)
 
-    # Special case for yt-dlp executable
-    try:
-        subprocess.run(["yt-dlp", "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        print(colored("yt-dlp executable is already installed.", 'green'))
-    except FileNotFoundError:
-        print(colored("yt-dlp executable not found. Attempting to install via pip...", 'yellow'))
+    # Install everything that is missing with a single pip run
+    if missing:
+        print(colored(f"Attempting to install: {', '.join(missing)}...", 'yellow'))
         try:
-            subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'yt-dlp'])
-            print(colored("Successfully installed yt-dlp.", 'green'))
+            subprocess.check_call([sys.executable, '-m', 'pip', 'install', *missing])
+            print(colored(f"Successfully installed {', '.join(missing)}.", 'green'))
         except subprocess.CalledProcessError as e:
-            print(colored(f"Failed to install yt-dlp: {str(e)}. Please install it manually from https://github.com/yt-dlp/yt-dlp", 'red'))
+            print(colored(f"Failed to install {', '.join(missing)}: {str(e)}. Please install them manually.", 'red'))
+            print(colored(f"Run: pip install {' '.join(missing)}", 'red'))
             sys.exit(1)
 
 # Function to check for required dependencies
 def check_dependencies():
-    """Ensure all required dependencies are installed."""
-    try:
-        import googleapiclient
-    except ImportError:
-        print(colored("googleapiclient is not installed.", 'red'))
-        sys.exit(1)
-    try:
-        import termcolor
-    except ImportError:
-        print(colored("termcolor is not installed.", 'red'))
-        sys.exit(1)
-    try:
-        subprocess.run(["yt-dlp", "--version"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except FileNotFoundError:
-        print(colored("yt-dlp is not installed.", 'red'))
-        sys.exit(1)
-    try:
-        import mutagen
-    except ImportError:
-        print(colored("mutagen is not installed.", 'red'))
-        sys.exit(1)
+    """Ensure all required dependencies are installed without importing them."""
+    modules = {
+        'googleapiclient': 'googleapiclient',
+        'termcolor': 'termcolor',
+        'yt-dlp': 'yt_dlp',
+        'mutagen': 'mutagen'
+    }
+    for package_name, import_name in modules.items():
+        if importlib.util.find_spec(import_name) is None:
+            print(colored(f"{package_name} is not installed. Run with --setup to install it.", 'red'))
+            sys.exit(1)
 
 # Function to print a styled header
 def print_header(text):
@@ -87,14 +82,24 @@ def print_section(text):
 # Function to sanitize filenames
 def sanitize_filename(name):
     """Replace invalid characters in filenames with underscores."""
-    return re.sub(r'[^\w\-_\. ]', '_', name)
+    return INVALID_FILENAME_CHARS.sub('_', name)
+
+# Function to pick a filename that is not already taken
+def unique_filename(base_filename, extension, existing_names):
+    """Return the first of name.ext, name_1.ext, name_2.ext, ... not in existing_names."""
+    for counter in itertools.count():
+        suffix = f"_{counter}" if counter else ""
+        candidate = f"{base_filename}{suffix}{extension}"
+        if candidate not in existing_names:
+            return candidate
 
 # Function to extract artist and song from title
+@functools.lru_cache(maxsize=4096)
 def extract_metadata(title):
     """Attempt to split the title into artist and song."""
-    parts = title.split(" - ", 1)
-    if len(parts) == 2:
-        return parts[0], parts[1]
+    artist, separator, song = title.partition(" - ")
+    if separator:
+        return artist, song
     return "Unknown Artist", title
 
 # Function to search YouTube for top videos
@@ -106,7 +111,8 @@ def get_top_videos(youtube, query, max_results=15):
             q=query,
             type="video",
             order="viewCount",
-            maxResults=max_results
+            maxResults=max_results,
+            fields="items(id/videoId,snippet/title)"
         )
         response = request.execute()
         videos = []
@@ -122,23 +128,196 @@ def get_top_videos(youtube, query, max_results=15):
         print(colored(f"Search failed: {str(e)}", 'red'))
         return []
 
+# Function to look up video information with yt-dlp
+def get_video_info(ydl, url):
+    """Return the extracted video information without downloading, or None on failure."""
+    try:
+        info = ydl.extract_info(url, download=False)
+    except Exception:
+        return None
+    return info if info and info.get('title') else None
+
+# Function to download with yt-dlp, reusing previously extracted info when possible
+def download_with_info(ydl, url, info=None):
+    """Download from extracted info, re-extracting from the URL only if that fails."""
+    if info:
+        try:
+            # Same cleanup yt-dlp applies before downloading from an info file
+            return ydl.process_ie_result(ydl.sanitize_info(info, remove_private_keys=True), download=True)
+        except Exception as e:
+            ydl.report_warning(f"Reusing extracted info failed: {e}; trying with URL {url}")
+    return ydl.extract_info(url, download=True)
+
+# Logger that keeps only the last few yt-dlp warnings and errors
+class YtDlpLogger:
+    """Collect a bounded tail of yt-dlp messages instead of buffering all output."""
+    def __init__(self, verbose=False, max_lines=50):
+        self.verbose = verbose
+        self.tail = deque(maxlen=max_lines)
+        self.last_progress = ''
+
+    def progress_hook(self, status):
+        """Keep only the latest progress state, redrawing it in place when verbose."""
+        total = status.get('total_bytes') or status.get('total_bytes_estimate')
+        if total:
+            self.last_progress = f"{status.get('downloaded_bytes', 0) / total:.1%}"
+        if self.verbose and self.last_progress:
+            end = '\n' if status.get('status') != 'downloading' else ''
+            print(f"\rDownloaded {self.last_progress}", end=end, flush=True)
+
+    def failure_message(self, exc=None):
+        """Describe a failed download from the collected errors."""
+        lines = list(self.tail) or ([str(exc)] if exc else [])
+        if self.last_progress:
+            lines.append(f"Stopped at {self.last_progress}")
+        return '\n'.join(lines)
+
+    def debug(self, msg):
+        if self.verbose:
+            print(msg)
+
+    def info(self, msg):
+        if self.verbose:
+            print(msg)
+
+    def warning(self, msg):
+        self.tail.append(msg)
+        if self.verbose:
+            print(msg, file=sys.stderr)
+
+    def error(self, msg):
+        self.tail.append(msg)
+        if self.verbose:
+            print(msg, file=sys.stderr)
+
 # Function to download file with yt-dlp
-def download_file(url, output_path, download_type, verbose=False):
-    """Download audio or video using yt-dlp."""
-    cmd = ["yt-dlp", "-o", output_path, url]
+def download_file(url, output_path, download_type, verbose=False, info=None):
+    """Download audio or video using the in-process yt-dlp API, reusing extracted info if given."""
+    from yt_dlp import YoutubeDL
+    
+    ydl_logger = YtDlpLogger(verbose)
+    ydl_opts = {
+        'outtmpl': output_path,
+        'noplaylist': True,
+        'logger': ydl_logger,
+        'verbose': verbose,
+        'noprogress': True,
+        'progress_hooks': [ydl_logger.progress_hook],
+        **YDL_TRANSFER_OPTS
+    }
     if download_type == 'audio':
-        cmd.extend(["-x", "--audio-format", "mp3"])
-    if verbose:
-        cmd.append("--verbose")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    return result.returncode == 0, result.stderr
+        ydl_opts['format'] = 'bestaudio/best'
+        ydl_opts['postprocessors'] = [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3'
+        }]
+    try:
+        with YoutubeDL(ydl_opts) as ydl:
+            download_with_info(ydl, url, info)
+            return True, ""
+    except Exception as e:
+        return False, ydl_logger.failure_message(e)
+
+# Function to download the raw audio stream with yt-dlp
+def download_audio_source(url, output_path, verbose=False, info=None):
+    """Download the best audio stream without converting it and return its path."""
+    from yt_dlp import YoutubeDL
+    
+    ydl_logger = YtDlpLogger(verbose)
+    ydl_opts = {
+        'outtmpl': os.path.splitext(output_path)[0] + '.source.%(ext)s',
+        'format': 'bestaudio/best',
+        'noplaylist': True,
+        'logger': ydl_logger,
+        'verbose': verbose,
+        'noprogress': True,
+        'progress_hooks': [ydl_logger.progress_hook],
+        **YDL_TRANSFER_OPTS
+    }
+    try:
+        with YoutubeDL(ydl_opts) as ydl:
+            info = download_with_info(ydl, url, info)
+            return ydl.prepare_filename(info), ""
+    except Exception as e:
+        return None, ydl_logger.failure_message(e)
+
+# Function to convert a downloaded audio stream to mp3 with ffmpeg
+def transcode_audio(source_path, output_path):
+    """Convert the source audio file to mp3, removing the source whether or not that worked."""
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", source_path,
+           "-vn", "-codec:a", "libmp3lame", "-q:a", "5", output_path]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    except FileNotFoundError:
+        return False, "ffmpeg is not installed."
+    finally:
+        # Don't leave the intermediate .source file behind in the output folder
+        try:
+            os.remove(source_path)
+        except OSError:
+            pass
+    if result.returncode != 0:
+        return False, result.stderr.strip()
+    return True, ""
+
+# Function to download all queued items in parallel
+def download_queued(queued, default_album, max_workers=4, transcode_workers=2):
+    """Download queued items concurrently, transcoding and tagging audio while other downloads run."""
+    from mutagen.easyid3 import EasyID3
+    
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as download_pool, \
+            ThreadPoolExecutor(max_workers=transcode_workers) as transcode_pool:
+        # Parallel jobs stay quiet so their output does not interleave; failures report the
+        # collected warnings and errors, and the retry below runs one verbose download at a time
+        download_futures = {}
+        for job in queued:
+            if job['download_type'] == 'audio':
+                future = download_pool.submit(download_audio_source, job['url'], job['output_path'], info=job['info'])
+            else:
+                future = download_pool.submit(download_file, job['url'], job['output_path'], job['download_type'], info=job['info'])
+            download_futures[future] = job
+        
+        # Network-bound downloads feed the CPU-bound ffmpeg stage as soon as each one finishes
+        transcode_futures = {}
+        for future in as_completed(download_futures):
+            job = download_futures[future]
+            result, error_msg = future.result()
+            if not result:
+                print(colored(f"{job['download_type'].capitalize()} download failed: {job['output_filename']}: {error_msg}", 'red'))
+                failed.append(job)
+            elif job['download_type'] == 'audio':
+                transcode_futures[transcode_pool.submit(transcode_audio, result, job['output_path'])] = job
+            else:
+                print(colored(f"Video downloaded: {job['output_filename']}", 'green'))
+        
+        for future in as_completed(transcode_futures):
+            job = transcode_futures[future]
+            success, error_msg = future.result()
+            if not success:
+                print(colored(f"Audio conversion failed: {job['output_filename']}: {error_msg}", 'red'))
+                failed.append(job)
+                continue
+            try:
+                audio = EasyID3(job['output_path'])
+                audio['title'] = job['song_title']
+                audio['artist'] = job['artist']
+                audio['album'] = default_album
+                audio.save()
+                print(colored(f"Audio downloaded and metadata set: {job['output_filename']}", 'green'))
+            except Exception as e:
+                print(colored(f"Metadata setting failed: {str(e)}", 'red'))
+    return failed
 
 # Main function to run the downloader
 def main():
     """Main program logic for the YouTube Downloader."""
-    # Install and check dependencies
-    install_dependencies()
+    # Install dependencies only when asked, otherwise just check they are present
+    if '--setup' in sys.argv:
+        install_dependencies()
     check_dependencies()
+    from googleapiclient.discovery import build
+    from yt_dlp import YoutubeDL
     
     # Welcome message
     print_header("Welcome to the YouTube Downloader!")
@@ -164,113 +343,109 @@ def main():
     # Get default album name for audio metadata
     default_album = input(colored("Enter default album name (default: 'YouTube Downloads'): ", 'green')) or "YouTube Downloads"
     
-    # Main loop for downloading
-    while True:
-        song = input(colored("Enter a song name or YouTube URL (or 'done' to finish): ", 'green'))
-        if song.lower() == 'done':
-            break
-        
-        if song.startswith('http'):
-            # Handle direct URL
-            result = subprocess.run(["yt-dlp", "--get-title", song], capture_output=True, text=True)
-            if result.returncode == 0:
-                title = result.stdout.strip()
-                selected_video = {'title': title, 'url': song}
+    # Downloads are collected here and run in parallel once the user is done
+    queued = []
+    # Names already taken in the folder, including ones reserved by queued downloads
+    existing_names = {entry.name for entry in os.scandir(folder)}
+    
+    # Long-lived yt-dlp instance for looking up direct URLs, closed once input is finished
+    with YoutubeDL({'quiet': True, 'no_warnings': True, 'skip_download': True}) as probe_ydl:
+        # Main loop for downloading
+        while True:
+            song = input(colored("Enter a song name or YouTube URL (or 'done' to finish): ", 'green'))
+            if song.lower() == 'done':
+                break
+            
+            if song.startswith('http'):
+                # Handle direct URL, keeping the extracted info so the download can skip re-extraction
+                info = get_video_info(probe_ydl, song)
+                if info:
+                    selected_video = {'title': info['title'], 'url': song, 'info': info}
+                else:
+                    print(colored("Failed to get video title. Please check the URL.", 'red'))
+                    continue
             else:
-                print(colored("Failed to get video title. Please check the URL.", 'red'))
-                continue
-        else:
-            # Search for videos
-            videos = get_top_videos(youtube, song)
-            if not videos:
-                print(colored(f"No videos found for: {song}", 'red'))
-                continue
+                # Search for videos
+                videos = get_top_videos(youtube, song)
+                if not videos:
+                    print(colored(f"No videos found for: {song}", 'red'))
+                    continue
+                
+                print_section("Top 15 search results:")
+                for i, video in enumerate(videos, 1):
+                    print(colored(f"{i}. {video['title']}", 'white'))
+                
+                choice = input(colored("Enter the number of the correct video (or 'skip'): ", 'green'))
+                if choice.lower() == 'skip':
+                    continue
+                
+                try:
+                    choice_num = int(choice)
+                    if 1 <= choice_num <= 15:
+                        selected_video = videos[choice_num - 1]
+                    else:
+                        print(colored("Invalid number. Please enter 1-15.", 'red'))
+                        continue
+                except ValueError:
+                    print(colored("Invalid input. Enter a number or 'skip'.", 'red'))
+                    continue
+            
+            # Display selected video
+            print(colored(f"Selected: {selected_video['title']}", 'green'))
+            
+            # Extract and edit metadata
+            artist, song_title = extract_metadata(selected_video['title'])
+            print(colored(f"Extracted Artist: {artist}", 'yellow'))
+            print(colored(f"Extracted Song: {song_title}", 'yellow'))
+            edit = input(colored("Edit artist and song name? (yes/no): ", 'green'))
+            if edit.lower() == 'yes':
+                artist = input(colored("Enter artist name: ", 'green'))
+                song_title = input(colored("Enter song title: ", 'green'))
             
-            print_section("Top 15 search results:")
-            for i, video in enumerate(videos, 1):
-                print(colored(f"{i}. {video['title']}", 'white'))
+            # Open video for confirmation without waiting for the browser to start
+            threading.Thread(target=webbrowser.open, args=(selected_video['url'],), daemon=True).start()
+            print(colored("Video playing in browser. Confirm it’s correct.", 'yellow'))
             
-            choice = input(colored("Enter the number of the correct video (or 'skip'): ", 'green'))
-            if choice.lower() == 'skip':
+            # Confirm download
+            confirm = input(colored("Download this? (yes/no): ", 'green'))
+            if confirm.lower() != 'yes':
+                print(colored("Skipping download.", 'yellow'))
                 continue
             
-            try:
-                choice_num = int(choice)
-                if 1 <= choice_num <= 15:
-                    selected_video = videos[choice_num - 1]
-                else:
-                    print(colored("Invalid number. Please enter 1-15.", 'red'))
-                    continue
-            except ValueError:
-                print(colored("Invalid input. Enter a number or 'skip'.", 'red'))
+            # Choose download type
+            download_type = input(colored("Download audio or video? (audio/video): ", 'green')).lower()
+            if download_type not in ['audio', 'video']:
+                print(colored("Invalid choice. Skipping download.", 'red'))
                 continue
-        
-        # Display selected video
-        print(colored(f"Selected: {selected_video['title']}", 'green'))
-        
-        # Extract and edit metadata
-        artist, song_title = extract_metadata(selected_video['title'])
-        print(colored(f"Extracted Artist: {artist}", 'yellow'))
-        print(colored(f"Extracted Song: {song_title}", 'yellow'))
-        edit = input(colored("Edit artist and song name? (yes/no): ", 'green'))
-        if edit.lower() == 'yes':
-            artist = input(colored("Enter artist name: ", 'green'))
-            song_title = input(colored("Enter song title: ", 'green'))
-        
-        # Open video for confirmation
-        webbrowser.open(selected_video['url'])
-        print(colored("Video playing in browser. Confirm it’s correct.", 'yellow'))
-        
-        # Confirm download
-        confirm = input(colored("Download this? (yes/no): ", 'green'))
-        if confirm.lower() != 'yes':
-            print(colored("Skipping download.", 'yellow'))
-            continue
-        
-        # Choose download type
-        download_type = input(colored("Download audio or video? (audio/video): ", 'green')).lower()
-        if download_type not in ['audio', 'video']:
-            print(colored("Invalid choice. Skipping download.", 'red'))
-            continue
-        
-        # Set output path
-        if download_type == 'audio':
-            output_filename = f"{sanitize_filename(song_title)}.mp3"
-            extension = ".mp3"
-        else:
-            output_filename = f"{sanitize_filename(song_title)}.%(ext)s"
-            extension = ".%(ext)s"
-        
-        output_path = os.path.join(folder, output_filename)
-        counter = 1
-        base_filename = output_filename.split('.')[0]
-        while os.path.exists(output_path):
-            output_filename = f"{base_filename}_{counter}{extension}"
+            
+            # Set output path
+            extension = ".mp3" if download_type == 'audio' else ".%(ext)s"
+            output_filename = unique_filename(sanitize_filename(song_title), extension, existing_names)
+            existing_names.add(output_filename)
             output_path = os.path.join(folder, output_filename)
-            counter += 1
-        
-        # Attempt download
-        success, error_msg = download_file(selected_video['url'], output_path, download_type, verbose=True)
-        if success:
-            if download_type == 'audio':
-                try:
-                    audio = EasyID3(output_path)
-                    audio['title'] = song_title
-                    audio['artist'] = artist
-                    audio['album'] = default_album
-                    audio.save()
-                    print(colored(f"Audio downloaded and metadata set: {output_filename}", 'green'))
-                except Exception as e:
-                    print(colored(f"Metadata setting failed: {str(e)}", 'red'))
-            else:
-                print(colored(f"Video downloaded: {output_filename}", 'green'))
-        else:
-            print(colored(f"{download_type.capitalize()} download failed: {error_msg}", 'red'))
-            retry = input(colored("Retry with verbose output? (yes/no): ", 'green'))
+            
+            # Queue download
+            queued.append({
+                'url': selected_video['url'],
+                'output_path': output_path,
+                'output_filename': output_filename,
+                'download_type': download_type,
+                'artist': artist,
+                'song_title': song_title,
+                'info': selected_video.get('info')
+            })
+            print(colored(f"Queued for download: {output_filename}", 'green'))
+    
+    # Download everything that was queued
+    if queued:
+        print_section(f"Downloading {len(queued)} item(s)...")
+        failed = download_queued(queued, default_album)
+        for job in failed:
+            retry = input(colored(f"Retry {job['output_filename']} with verbose output? (yes/no): ", 'green'))
             if retry.lower() == 'yes':
-                success, error_msg = download_file(selected_video['url'], output_path, download_type, verbose=True)
+                success, error_msg = download_file(job['url'], job['output_path'], job['download_type'], verbose=True)
                 if success:
-                    print(colored(f"{download_type.capitalize()} downloaded successfully on retry!", 'green'))
+                    print(colored(f"{job['download_type'].capitalize()} downloaded successfully on retry!", 'green'))
                 else:
                     print(colored(f"Retry failed: {error_msg}", 'red'))
     
@@ -0,0 +1,47 @@
+"""
+Helpers shared by the YouTube Downloader Pro modules
+"""
+
+import json
+import sys
+import threading
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard library json module is used instead
+    orjson = None
+
+# Drop the per-instance __dict__ where dataclasses support it (Python 3.10+)
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+def dumps_json(obj, indent: bool = False) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON, indented by two spaces if asked."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+def loads_json(data: bytes):
+    """Parse UTF-8 encoded JSON."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class PerThread:
+    """Lazily creates one object per thread, for clients that must not be shared between threads.
+
+    API clients built on httplib2 and YoutubeDL instances are not thread-safe, so each worker
+    thread gets its own from the factory. ``initial``, if given, is used by the creating thread.
+    """
+
+    def __init__(self, factory, initial=None):
+        self._factory = factory
+        self._local = threading.local()
+        if initial is not None:
+            self._local.value = initial
+
+    def get(self):
+        """Return the calling thread's object, creating it on first use."""
+        value = getattr(self._local, 'value', None)
+        if value is None:
+            value = self._local.value = self._factory()
+        return value
@@ -0,0 +1,21 @@
+"""
+Shared pytest fixtures for YouTube Downloader Pro
+"""
+
+import pytest
+
+from yt_downloader_enhanced import YouTubeDownloaderEnhanced
+
+@pytest.fixture(scope="session")
+def downloader(tmp_path_factory):
+    """A downloader instance (without a real API key) for tests that need no network."""
+    downloader = YouTubeDownloaderEnhanced("dummy_key", str(tmp_path_factory.mktemp("downloads")))
+    yield downloader
+    downloader.close()
+
+@pytest.fixture
+def queue_downloader(tmp_path):
+    """A downloader with its own empty queue, for tests that add to it or change item statuses."""
+    downloader = YouTubeDownloaderEnhanced("dummy_key", str(tmp_path / "downloads"))
+    yield downloader
+    downloader.close()
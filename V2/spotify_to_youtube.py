@@ -1,14 +1,30 @@
 import os
-import json
+import sys
 import re
+import shelve
+import hashlib
+import asyncio
 import logging
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
+from dataclasses import dataclass, asdict
+import httplib2
+import requests
+from requests.adapters import HTTPAdapter
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 from googleapiclient.discovery import build
 from termcolor import colored
 
+from common import DATACLASS_SLOTS, PerThread, dumps_json
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional; searches fall back to a thread pool
+    aiohttp = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -20,7 +36,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Spotify's maximum page size for playlist items, and the only fields we read from them
+PLAYLIST_PAGE_SIZE = 100
+PLAYLIST_FIELDS = "items(track(name,artists(name),album(name),external_urls.spotify)),next,total"
+
+# Keep-alive connections shared by every request a client makes
+HTTP_TIMEOUT = 20
+HTTP_POOL_SIZE = 10
+
+# Direct REST endpoint used for the asyncio search fan-out, and its in-flight request cap
+YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+SEARCH_CONCURRENCY = 20
+
+@dataclass(**DATACLASS_SLOTS)
 class SpotifyTrack:
     """Represents a Spotify track with relevant metadata."""
     title: str
@@ -34,33 +62,76 @@ class SpotifyTrack:
 class SpotifyToYouTubeConverter:
     """Converts Spotify playlist tracks to YouTube URLs with verification."""
 
-    def __init__(self, spotify_client_id: str, spotify_client_secret: str, youtube_api_key: str):
-        self.sp = spotipy.Spotify(auth_manager=SpotifyClientCredentials(
-            client_id=spotify_client_id,
-            client_secret=spotify_client_secret
-        ))
-        self.youtube = build("youtube", "v3", developerKey=youtube_api_key)
+    # shelve databases are not safe for concurrent access, even from one process
+    _cache_lock = threading.Lock()
+
+    def __init__(self, spotify_client_id: str, spotify_client_secret: str, youtube_api_key: str,
+                 use_cache: bool = True, cache_path: str = ".yt_search_cache"):
+        spotify_session = requests.Session()
+        spotify_session.mount("https://", HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE))
+        self.sp = spotipy.Spotify(
+            auth_manager=SpotifyClientCredentials(
+                client_id=spotify_client_id,
+                client_secret=spotify_client_secret
+            ),
+            requests_session=spotify_session,
+            requests_timeout=HTTP_TIMEOUT
+        )
+        self.youtube_api_key = youtube_api_key
+        self.youtube = self._build_youtube_client()
         self.tracks: List[SpotifyTrack] = []
+        # Worker threads each get their own client
+        self._youtube_clients = PerThread(self._build_youtube_client, self.youtube)
+        self.use_cache = use_cache
+        self.cache_path = cache_path
+
+    def _build_youtube_client(self):
+        """Builds a YouTube API client on its own persistent HTTP connection."""
+        return build("youtube", "v3", developerKey=self.youtube_api_key,
+                     http=httplib2.Http(timeout=HTTP_TIMEOUT))
+
+    def _get_youtube_client(self):
+        """Returns the YouTube API client owned by the calling thread."""
+        return self._youtube_clients.get()
+
+    def _fetch_playlist_page(self, playlist_id: str, offset: int) -> List[Dict]:
+        """Fetches one page of playlist items starting at the given offset."""
+        results = self.sp.playlist_items(playlist_id, fields=PLAYLIST_FIELDS,
+                                         limit=PLAYLIST_PAGE_SIZE, offset=offset)
+        return results["items"]
+
+    @staticmethod
+    def _parse_playlist_items(items: List[Dict]) -> List[SpotifyTrack]:
+        """Converts raw playlist items into SpotifyTracks, skipping removed tracks."""
+        spotify_tracks = []
+        for item in items:
+            track = item["track"]
+            if track:
+                title = track["name"]
+                artist = track["artists"][0]["name"] if track["artists"] else "Unknown Artist"
+                album = track["album"]["name"] if track["album"] else "Unknown Album"
+                spotify_url = track["external_urls"]["spotify"]
+                spotify_tracks.append(SpotifyTrack(title, artist, album, spotify_url))
+        return spotify_tracks
+
+    def iter_playlist_tracks(self, playlist_url: str, max_workers: int = 8) -> Iterator[List[SpotifyTrack]]:
+        """Yields the tracks of a Spotify playlist one page at a time, in playlist order."""
+        playlist_id = playlist_url.split("/")[-1].split("?")[0]
+        results = self.sp.playlist_items(playlist_id, fields=PLAYLIST_FIELDS,
+                                         limit=PLAYLIST_PAGE_SIZE, offset=0)
+        yield self._parse_playlist_items(results["items"])
+        if results["next"]:
+            # The first page tells us the total, so the remaining pages can be fetched together
+            offsets = range(PLAYLIST_PAGE_SIZE, results["total"], PLAYLIST_PAGE_SIZE)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for page in executor.map(lambda offset: self._fetch_playlist_page(playlist_id, offset), offsets):
+                    yield self._parse_playlist_items(page)
 
-    def get_playlist_tracks(self, playlist_url: str) -> List[SpotifyTrack]:
+    def get_playlist_tracks(self, playlist_url: str, max_workers: int = 8) -> List[SpotifyTrack]:
         """Fetches all tracks from a Spotify playlist URL."""
         try:
-            playlist_id = playlist_url.split("/")[-1].split("?")[0]
-            results = self.sp.playlist_items(playlist_id)
-            tracks = results["items"]
-            while results["next"]:
-                results = self.sp.next(results)
-                tracks.extend(results["items"])
-
-            spotify_tracks = []
-            for item in tracks:
-                track = item["track"]
-                if track:
-                    title = track["name"]
-                    artist = track["artists"][0]["name"] if track["artists"] else "Unknown Artist"
-                    album = track["album"]["name"] if track["album"] else "Unknown Album"
-                    spotify_url = track["external_urls"]["spotify"]
-                    spotify_tracks.append(SpotifyTrack(title, artist, album, spotify_url))
+            spotify_tracks = [track for page in self.iter_playlist_tracks(playlist_url, max_workers)
+                              for track in page]
             logger.info(f"Found {len(spotify_tracks)} tracks in Spotify playlist.")
             self.tracks = spotify_tracks
             return spotify_tracks
@@ -68,73 +139,189 @@ class SpotifyToYouTubeConverter:
             logger.error(f"Error fetching Spotify playlist tracks: {e}")
             return []
 
-    def search_youtube_for_track(self, track: SpotifyTrack) -> Optional[Tuple[str, str]]:
-        """Searches YouTube for a given Spotify track and returns the best URL and title."""
-        query = f"{track.title} {track.artist}"
+    @staticmethod
+    def _cache_key(query: str) -> str:
+        """Returns the search cache key for a query."""
+        return hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _track_query(track: SpotifyTrack) -> str:
+        """Returns the YouTube search query for a track."""
+        return f"{track.title} {track.artist}"
+
+    @contextmanager
+    def _open_cache(self):
+        """Opens the search cache for a with block, yielding None if caching is off or the open fails."""
+        if not self.use_cache:
+            yield None
+            return
+        with self._cache_lock:
+            try:
+                cache = shelve.open(self.cache_path)
+            except Exception as e:
+                logger.warning(f"Error opening search cache: {e}")
+                cache = None
+            if cache is None:
+                yield None
+                return
+            with cache:
+                yield cache
+
+    def _cache_lookup(self, cache, query: str) -> Optional[Tuple[str, str]]:
+        """Returns the (youtube_url, youtube_title) stored for a query in an open cache, if any."""
+        if cache is None:
+            return None
         try:
-            search_response = self.youtube.search().list(
-                q=query,
-                type="video",
-                part="id,snippet",
-                maxResults=5  # Get a few results to pick the best one
-            ).execute()
-
-            videos = search_response.get("items", [])
-            if not videos:
-                track.verification_status = "not_found"
-                logger.warning(f"No YouTube video found for: {query}")
-                return None
+            return cache.get(self._cache_key(query))
+        except Exception as e:
+            logger.warning(f"Error reading search cache: {e}")
+            return None
 
-            # Simple heuristic: pick the first result for now, can be improved with more advanced matching
-            best_video = videos[0]
-            video_id = best_video["id"]["videoId"]
-            youtube_url = f"https://www.youtube.com/watch?v={video_id}"
-            youtube_title = best_video["snippet"]["title"]
+    def _cache_store(self, cache, entries: Iterable[Tuple[str, Tuple[str, str]]]):
+        """Stores (query, (youtube_url, youtube_title)) search results in an open cache."""
+        if cache is None:
+            return
+        try:
+            for query, result in entries:
+                cache[self._cache_key(query)] = result
+        except Exception as e:
+            logger.warning(f"Error writing search cache: {e}")
+
+    def _cache_get(self, query: str) -> Optional[Tuple[str, str]]:
+        """Returns the cached (youtube_url, youtube_title) for a query, if any."""
+        with self._open_cache() as cache:
+            return self._cache_lookup(cache, query)
+
+    def _cache_put(self, query: str, result: Tuple[str, str]):
+        """Stores a (youtube_url, youtube_title) search result for a query."""
+        with self._open_cache() as cache:
+            self._cache_store(cache, [(query, result)])
 
-            track.youtube_url = youtube_url
-            track.youtube_title = youtube_title
+    @staticmethod
+    def _search_params(query: str) -> Dict:
+        """Returns the YouTube search parameters used for a track query."""
+        return {
+            "q": query,
+            "type": "video",
+            "part": "id,snippet",
+            "maxResults": 5,  # Get a few results to pick the best one
+            "fields": "items(id/videoId,snippet/title)"
+        }
+
+    def _apply_cached_result(self, track: SpotifyTrack, query: str,
+                             cached: Optional[Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+        """Fills in a track from a cached search result, returning the result if there was one."""
+        if cached:
+            track.youtube_url, track.youtube_title = cached
             track.verification_status = "found"
-            logger.info(f"Found YouTube URL for '{query}': {youtube_url}")
-            return youtube_url, youtube_title
+            logger.info(f"Using cached YouTube URL for '{query}': {track.youtube_url}")
+        return cached
+
+    def _apply_search_results(self, track: SpotifyTrack, query: str, videos: List[Dict]) -> Optional[Tuple[str, str]]:
+        """Picks the best search result for a track and records it on the track."""
+        if not videos:
+            track.verification_status = "not_found"
+            logger.warning(f"No YouTube video found for: {query}")
+            return None
+
+        # Simple heuristic: pick the first result for now, can be improved with more advanced matching
+        best_video = videos[0]
+        video_id = best_video["id"]["videoId"]
+        youtube_url = f"https://www.youtube.com/watch?v={video_id}"
+        youtube_title = best_video["snippet"]["title"]
+
+        track.youtube_url = youtube_url
+        track.youtube_title = youtube_title
+        track.verification_status = "found"
+        logger.info(f"Found YouTube URL for '{query}': {youtube_url}")
+        return youtube_url, youtube_title
+
+    def _search_track(self, track: SpotifyTrack) -> Optional[Tuple[str, str]]:
+        """Searches YouTube for a track without consulting the cache."""
+        query = self._track_query(track)
+        try:
+            search_response = self._get_youtube_client().search().list(**self._search_params(query)).execute()
+            return self._apply_search_results(track, query, search_response.get("items", []))
 
         except Exception as e:
             logger.error(f"Error searching YouTube for '{query}': {e}")
             track.verification_status = "not_found"
             return None
 
-    def process_tracks(self):
+    def search_youtube_for_track(self, track: SpotifyTrack) -> Optional[Tuple[str, str]]:
+        """Searches YouTube for a given Spotify track and returns the best URL and title."""
+        query = self._track_query(track)
+        cached = self._apply_cached_result(track, query, self._cache_get(query))
+        if cached:
+            return cached
+
+        result = self._search_track(track)
+        if result:
+            self._cache_put(query, result)
+        return result
+
+    async def _search_tracks_async(self, tracks: List[SpotifyTrack]) -> List[Optional[Tuple[str, str]]]:
+        """Searches YouTube for many tracks concurrently on one event loop, returning results in order."""
+        semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+        async def search(session, track: SpotifyTrack):
+            query = self._track_query(track)
+            params = {**self._search_params(query), "key": self.youtube_api_key}
+            try:
+                async with semaphore, session.get(YOUTUBE_SEARCH_URL, params=params) as response:
+                    response.raise_for_status()
+                    search_response = await response.json()
+            except Exception as e:
+                logger.error(f"Error searching YouTube for '{query}': {e}")
+                track.verification_status = "not_found"
+                return None
+            return self._apply_search_results(track, query, search_response.get("items", []))
+
+        timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            return await asyncio.gather(*(search(session, track) for track in tracks))
+
+    def process_tracks(self, max_workers: int = 10):
         """Processes all Spotify tracks to find their YouTube counterparts."""
-        for track in self.tracks:
-            if track.verification_status == "pending":
-                self.search_youtube_for_track(track)
+        pending = [track for track in self.tracks if track.verification_status == "pending"]
+        if not pending:
+            return
+        # The cache stays open for the whole run and is only touched from this thread
+        with self._open_cache() as cache:
+            pending = [track for track in pending if not self._apply_cached_result(
+                track, self._track_query(track), self._cache_lookup(cache, self._track_query(track)))]
+            if not pending:
+                return
+            if aiohttp is not None:
+                results = asyncio.run(self._search_tracks_async(pending))
+            else:
+                # Searches are I/O-bound, so overlap the API round-trips across a thread pool
+                with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                    results = list(executor.map(self._search_track, pending))
+            # New results are written in one batch once every search has finished
+            self._cache_store(cache, [(self._track_query(track), result)
+                                      for track, result in zip(pending, results) if result])
 
     def export_youtube_urls(self, file_path: str):
         """Exports the found YouTube URLs to a text file."""
+        urls = [track.youtube_url for track in self.tracks if track.youtube_url]
         try:
             with open(file_path, "w", encoding="utf-8") as f:
-                for track in self.tracks:
-                    if track.youtube_url:
-                        f.write(f"{track.youtube_url}\n")
+                f.write("".join(f"{url}\n" for url in urls))
             logger.info(f"YouTube URLs exported to {file_path}")
         except Exception as e:
             logger.error(f"Error exporting YouTube URLs: {e}")
 
     def export_full_results(self, file_path: str):
         """Exports full results (Spotify track info + YouTube URL) to a JSON file."""
-        results = []
-        for track in self.tracks:
-            results.append({
-                "title": track.title,
-                "artist": track.artist,
-                "album": track.album,
-                "spotify_url": track.spotify_url,
-                "youtube_url": track.youtube_url,
-                "youtube_title": track.youtube_title,
-                "verification_status": track.verification_status
-            })
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            # Stream one track object per line rather than building the whole document first
+            with open(file_path, "wb") as f:
+                f.write(b"[")
+                for i, track in enumerate(self.tracks):
+                    f.write(b",\n  " if i else b"\n  ")
+                    f.write(dumps_json(asdict(track)))
+                f.write(b"\n]\n" if self.tracks else b"]\n")
             logger.info(f"Full results exported to {file_path}")
         except Exception as e:
             logger.error(f"Error exporting full results: {e}")
@@ -153,7 +340,8 @@ def main():
         print(colored("You can get YouTube API key from https://console.developers.google.com/apis/credentials", "yellow"))
         return
 
-    converter = SpotifyToYouTubeConverter(spotify_client_id, spotify_client_secret, youtube_api_key)
+    converter = SpotifyToYouTubeConverter(spotify_client_id, spotify_client_secret, youtube_api_key,
+                                          use_cache="--no-cache" not in sys.argv)
 
     while True:
         playlist_url = input(colored("Enter Spotify playlist URL (or 'q' to quit): ", "cyan"))
@@ -3,298 +3,440 @@
 Basic functionality tests for YouTube Downloader Pro
 """
 
-import os
+import importlib
+import json
+import shelve
 import sys
-import tempfile
-from pathlib import Path
+import threading
+import time
+from concurrent.futures import CancelledError
 
-def test_imports():
+import pytest
+import yt_dlp
+
+import common
+import spotify_to_youtube
+from common import PerThread, dumps_json, loads_json
+from yt_downloader_enhanced import MAX_VERIFY_WORKERS, DownloadItem
+from spotify_to_youtube import SpotifyToYouTubeConverter, SpotifyTrack
+from yt_downloader_gui import VirtualTreeview, _clip
+
+@pytest.mark.parametrize("module_name", [
+    "yt_dlp",
+    "googleapiclient.discovery",
+    "spotipy",
+    "termcolor",
+    "mutagen.easyid3"
+])
+def test_imports(module_name):
     """Test that all required modules can be imported."""
-    print("Testing imports...")
-    
-    try:
-        import yt_dlp
-        print("✓ yt-dlp imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import yt-dlp: {e}")
-        return False
-    
-    try:
-        from googleapiclient.discovery import build
-        print("✓ Google API client imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import Google API client: {e}")
-        return False
-    
-    try:
-        import spotipy
-        print("✓ Spotipy imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import spotipy: {e}")
-        return False
-    
-    try:
-        from termcolor import colored
-        print("✓ Termcolor imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import termcolor: {e}")
-        return False
-    
-    try:
-        from mutagen.easyid3 import EasyID3
-        print("✓ Mutagen imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import mutagen: {e}")
-        return False
-    
-    return True
-
-def test_module_imports():
+    importlib.import_module(module_name)
+
+@pytest.mark.parametrize("module_name", [
+    "yt_downloader_enhanced",
+    "spotify_to_youtube",
+    "tkinter"
+])
+def test_module_imports(module_name):
     """Test that our custom modules can be imported."""
-    print("\nTesting custom module imports...")
-    
-    try:
-        from yt_downloader_enhanced import YouTubeDownloaderEnhanced, DownloadItem
-        print("✓ Enhanced downloader imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import enhanced downloader: {e}")
-        return False
-    
-    try:
-        from spotify_to_youtube import SpotifyToYouTubeConverter, SpotifyTrack
-        print("✓ Spotify converter imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import Spotify converter: {e}")
-        return False
-    
-    try:
-        import tkinter as tk
-        print("✓ Tkinter imported successfully")
-    except ImportError as e:
-        print(f"✗ Failed to import tkinter: {e}")
-        return False
-    
-    return True
-
-def test_url_validation():
-    """Test URL validation functionality."""
-    print("\nTesting URL validation...")
-    
-    try:
-        from yt_downloader_enhanced import YouTubeDownloaderEnhanced
-        
-        # Create a temporary downloader instance (without API key for testing)
-        with tempfile.TemporaryDirectory() as temp_dir:
-            downloader = YouTubeDownloaderEnhanced("dummy_key", temp_dir)
-            
-            # Test valid URLs
-            valid_urls = [
-                "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
-                "https://youtu.be/dQw4w9WgXcQ",
-                "https://youtube.com/watch?v=dQw4w9WgXcQ",
-                "www.youtube.com/watch?v=dQw4w9WgXcQ"
-            ]
-            
-            for url in valid_urls:
-                if downloader.validate_youtube_url(url):
-                    print(f"✓ Valid URL recognized: {url}")
-                else:
-                    print(f"✗ Valid URL not recognized: {url}")
-                    return False
-            
-            # Test invalid URLs
-            invalid_urls = [
-                "https://www.google.com",
-                "not a url",
-                "https://vimeo.com/123456",
-                ""
-            ]
-            
-            for url in invalid_urls:
-                if not downloader.validate_youtube_url(url):
-                    print(f"✓ Invalid URL correctly rejected: {url}")
-                else:
-                    print(f"✗ Invalid URL incorrectly accepted: {url}")
-                    return False
-        
-        return True
-    except Exception as e:
-        print(f"✗ URL validation test failed: {e}")
-        return False
+    importlib.import_module(module_name)
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtu.be/dQw4w9WgXcQ",
+    "https://youtube.com/watch?v=dQw4w9WgXcQ",
+    "www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://m.youtube.com/watch?v=dQw4w9WgXcQ&t=42"
+])
+def test_valid_url_accepted(downloader, url):
+    """Test that valid YouTube URLs are recognized."""
+    assert downloader.validate_youtube_url(url)
 
-def test_video_id_extraction():
+@pytest.mark.parametrize("url", [
+    "https://www.google.com",
+    "not a url",
+    "https://vimeo.com/123456",
+    "https://www.youtube.com/watch?v=short",
+    ""
+])
+def test_invalid_url_rejected(downloader, url):
+    """Test that non-YouTube URLs and search queries are rejected."""
+    assert not downloader.validate_youtube_url(url)
+
+@pytest.mark.parametrize("url, expected_id", [
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+    ("https://youtu.be/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+    ("https://www.youtube.com/embed/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+    ("https://www.youtube.com/v/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
+    ("https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ", "dQw4w9WgXcQ")
+])
+def test_video_id_extraction(downloader, url, expected_id):
     """Test video ID extraction from URLs."""
-    print("\nTesting video ID extraction...")
-    
-    try:
-        from yt_downloader_enhanced import YouTubeDownloaderEnhanced
-        
-        with tempfile.TemporaryDirectory() as temp_dir:
-            downloader = YouTubeDownloaderEnhanced("dummy_key", temp_dir)
-            
-            test_cases = [
-                ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "dQw4w9WgXcQ"),
-                ("https://youtu.be/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
-                ("https://www.youtube.com/embed/dQw4w9WgXcQ", "dQw4w9WgXcQ"),
-                ("https://www.youtube.com/v/dQw4w9WgXcQ", "dQw4w9WgXcQ")
-            ]
-            
-            for url, expected_id in test_cases:
-                extracted_id = downloader.extract_video_id(url)
-                if extracted_id == expected_id:
-                    print(f"✓ Correct ID extracted from {url}: {extracted_id}")
-                else:
-                    print(f"✗ Incorrect ID extracted from {url}: {extracted_id} (expected {expected_id})")
-                    return False
-        
-        return True
-    except Exception as e:
-        print(f"✗ Video ID extraction test failed: {e}")
-        return False
+    assert downloader.extract_video_id(url) == expected_id
 
 def test_download_item_creation():
     """Test DownloadItem dataclass creation."""
-    print("\nTesting DownloadItem creation...")
-    
-    try:
-        from yt_downloader_enhanced import DownloadItem
-        
-        # Test basic creation
-        item = DownloadItem("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
-        if item.url_or_query == "https://www.youtube.com/watch?v=dQw4w9WgXcQ":
-            print("✓ Basic DownloadItem created successfully")
-        else:
-            print("✗ Basic DownloadItem creation failed")
-            return False
-        
-        # Test with all parameters
-        item = DownloadItem(
-            url_or_query="test query",
-            media_type="video",
-            quality="720p",
-            status="completed",
-            error_message="",
-            file_path="/path/to/file.mp4",
-            title="Test Video",
-            duration="3:45",
-            view_count=1000000
-        )
-        
-        if (item.media_type == "video" and 
-            item.quality == "720p" and 
-            item.status == "completed"):
-            print("✓ Full DownloadItem created successfully")
-        else:
-            print("✗ Full DownloadItem creation failed")
-            return False
-        
-        return True
-    except Exception as e:
-        print(f"✗ DownloadItem creation test failed: {e}")
-        return False
+    # Test basic creation
+    item = DownloadItem("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    assert item.url_or_query == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    # Test with all parameters
+    item = DownloadItem(
+        url_or_query="test query",
+        media_type="video",
+        quality="720p",
+        status="completed",
+        error_message="",
+        file_path="/path/to/file.mp4",
+        title="Test Video",
+        duration="3:45",
+        view_count=1000000
+    )
+    assert item.media_type == "video"
+    assert item.quality == "720p"
+    assert item.status == "completed"
 
 def test_spotify_track_creation():
     """Test SpotifyTrack dataclass creation."""
-    print("\nTesting SpotifyTrack creation...")
-    
-    try:
-        from spotify_to_youtube import SpotifyTrack
-        
-        track = SpotifyTrack(
-            title="Never Gonna Give You Up",
-            artist="Rick Astley",
-            album="Whenever You Need Somebody",
-            spotify_url="https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC"
-        )
-        
-        if (track.title == "Never Gonna Give You Up" and 
-            track.artist == "Rick Astley" and
-            track.verification_status == "pending"):
-            print("✓ SpotifyTrack created successfully")
-            return True
-        else:
-            print("✗ SpotifyTrack creation failed")
-            return False
-    except Exception as e:
-        print(f"✗ SpotifyTrack creation test failed: {e}")
-        return False
-
-def test_file_operations():
-    """Test basic file operations."""
-    print("\nTesting file operations...")
-    
-    try:
-        # Test creating download directory
-        test_dir = Path(tempfile.gettempdir()) / "yt_downloader_test"
-        test_dir.mkdir(exist_ok=True)
-        
-        if test_dir.exists():
-            print("✓ Directory creation successful")
-        else:
-            print("✗ Directory creation failed")
-            return False
-        
-        # Test file writing
-        test_file = test_dir / "test.txt"
-        test_file.write_text("test content")
-        
-        if test_file.exists() and test_file.read_text() == "test content":
-            print("✓ File operations successful")
-        else:
-            print("✗ File operations failed")
-            return False
-        
-        # Cleanup
-        test_file.unlink()
-        test_dir.rmdir()
-        
+    track = SpotifyTrack(
+        title="Never Gonna Give You Up",
+        artist="Rick Astley",
+        album="Whenever You Need Somebody",
+        spotify_url="https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC"
+    )
+    assert track.title == "Never Gonna Give You Up"
+    assert track.artist == "Rick Astley"
+    assert track.verification_status == "pending"
+
+def test_search_cache(tmp_path):
+    """Test that cached YouTube search results are reused."""
+    converter = SpotifyToYouTubeConverter(
+        "dummy_id", "dummy_secret", "dummy_key",
+        cache_path=str(tmp_path / "search_cache")
+    )
+    track = SpotifyTrack(
+        title="Never Gonna Give You Up",
+        artist="Rick Astley",
+        album="Whenever You Need Somebody",
+        spotify_url="https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC"
+    )
+    cached = ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "Rick Astley - Never Gonna Give You Up")
+    converter._cache_put(f"{track.title} {track.artist}", cached)
+
+    # A cache hit must not touch the API (the dummy key would fail)
+    assert converter.search_youtube_for_track(track) == cached
+    assert track.youtube_url == cached[0]
+    assert track.verification_status == "found"
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_process_tracks_opens_cache_once(tmp_path, monkeypatch, use_async):
+    """Test that both search paths read and write the search cache through one open handle."""
+    converter = SpotifyToYouTubeConverter(
+        "dummy_id", "dummy_secret", "dummy_key",
+        cache_path=str(tmp_path / "search_cache")
+    )
+    cached_track = SpotifyTrack("Cached", "Artist", "Album", "https://open.spotify.com/track/1")
+    new_track = SpotifyTrack("New", "Artist", "Album", "https://open.spotify.com/track/2")
+    cached = ("https://www.youtube.com/watch?v=dQw4w9WgXcQ", "Cached")
+    found = ("https://www.youtube.com/watch?v=9bZkp7q19f0", "New")
+    converter._cache_put("Cached Artist", cached)
+    converter.tracks = [cached_track, new_track]
+
+    searched = []
+    def fake_search(track):
+        searched.append(track)
+        track.youtube_url, track.youtube_title = found
+        track.verification_status = "found"
+        return found
+    async def fake_search_async(tracks):
+        return [fake_search(track) for track in tracks]
+    opens = []
+    real_open = shelve.open
+    if use_async:
+        monkeypatch.setattr(converter, "_search_tracks_async", fake_search_async)
+    else:
+        monkeypatch.setattr(spotify_to_youtube, "aiohttp", None)
+        monkeypatch.setattr(converter, "_search_track", fake_search)
+    monkeypatch.setattr(shelve, "open", lambda *args: opens.append(args) or real_open(*args))
+
+    converter.process_tracks()
+    assert len(opens) == 1
+    assert searched == [new_track]
+    assert cached_track.youtube_url == cached[0]
+    assert converter._cache_get("New Artist") == found
+
+@pytest.mark.parametrize("tracks", [[], [
+    SpotifyTrack("Déjà Vu", "Artist", "Album", "https://open.spotify.com/track/1"),
+    SpotifyTrack("Song", "Artist", "Album", "https://open.spotify.com/track/2",
+                 youtube_url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+                 youtube_title="Song", verification_status="found")
+]])
+def test_export_full_results(tmp_path, tracks):
+    """Test that exported Spotify results are valid JSON."""
+    converter = SpotifyToYouTubeConverter("dummy_id", "dummy_secret", "dummy_key", use_cache=False)
+    export_path = tmp_path / "results.json"
+
+    converter.tracks = tracks
+    converter.export_full_results(str(export_path))
+    exported = json.loads(export_path.read_text(encoding="utf-8"))
+
+    assert [(entry["title"], entry["youtube_url"]) for entry in exported] == \
+        [(track.title, track.youtube_url) for track in tracks]
+
+def test_queue_status_counts(queue_downloader):
+    """Test that the status tallies follow items as they are added and change status."""
+    queue_downloader.add_to_queue(["first song", "  ", "second song"], media_type="video")
+    first, second = queue_downloader.download_queue
+    assert first.media_type == "video"
+    assert queue_downloader.get_queue_status() == \
+        {'total': 2, 'pending': 2, 'processing': 0, 'completed': 0, 'failed': 0}
+
+    queue_downloader._set_status(first, 'processing')
+    queue_downloader._set_status(second, 'failed')
+    queue_downloader._set_status(first, 'completed')
+    assert queue_downloader.get_queue_status() == \
+        {'total': 2, 'pending': 0, 'processing': 0, 'completed': 1, 'failed': 1}
+
+def test_clear_queue_during_run(queue_downloader):
+    """Test that items finishing after the queue was cleared do not change the new tallies."""
+    queue_downloader.add_to_queue(["first song"])
+    running = queue_downloader.download_queue[0]
+    queue_downloader._set_status(running, 'processing')
+
+    queue_downloader.clear_queue()
+    queue_downloader.add_to_queue(["second song"])
+    queue_downloader._set_status(running, 'completed')
+
+    assert running.status == 'completed'
+    assert queue_downloader.get_queue_status() == \
+        {'total': 1, 'pending': 1, 'processing': 0, 'completed': 0, 'failed': 0}
+
+def test_process_queue_skips_finished_items(queue_downloader, monkeypatch):
+    """Test that a resumed run only downloads the items still pending."""
+    queue_downloader.add_to_queue(["first song", "second song", "third song"])
+    first, second, third = queue_downloader.download_queue
+    queue_downloader._set_status(first, 'completed')
+    queue_downloader._set_status(second, 'failed')
+
+    started = []
+    def fake_download(item):
+        started.append(item)
+        queue_downloader._set_status(item, 'completed')
         return True
-    except Exception as e:
-        print(f"✗ File operations test failed: {e}")
-        return False
-
-def main():
-    """Run all tests."""
-    print("=" * 60)
-    print("YouTube Downloader Pro - Basic Functionality Tests")
-    print("=" * 60)
-    
-    tests = [
-        test_imports,
-        test_module_imports,
-        test_url_validation,
-        test_video_id_extraction,
-        test_download_item_creation,
-        test_spotify_track_creation,
-        test_file_operations
-    ]
-    
-    passed = 0
-    total = len(tests)
-    
-    for test in tests:
+    monkeypatch.setattr(queue_downloader, "download_single_item", fake_download)
+
+    results = queue_downloader.process_queue()
+    assert started == [third]
+    assert results == {'completed': 2, 'failed': 1, 'total': 3}
+
+def test_process_queue_stop_event(queue_downloader, monkeypatch):
+    """Test that no further downloads start once the stop event is set."""
+    queue_downloader.max_parallel = 1
+    queue_downloader.add_to_queue(["first song", "second song", "third song"])
+    stop_event = threading.Event()
+
+    started = []
+    def fake_download(item):
+        started.append(item)
+        # Pause arrives while the first download is still running
+        stop_event.set()
+        queue_downloader._set_status(item, 'completed')
+        return True
+    monkeypatch.setattr(queue_downloader, "download_single_item", fake_download)
+
+    finished = []
+    results = queue_downloader.process_queue(stop_event=stop_event, item_callback=finished.append)
+    assert started == finished == queue_downloader.download_queue[:1]
+    assert results['completed'] == 1
+    assert [item.status for item in queue_downloader.download_queue] == ['completed', 'pending', 'pending']
+
+    # With the event still set, a new run starts nothing at all
+    started.clear()
+    queue_downloader.process_queue(stop_event=stop_event)
+    assert started == []
+
+def test_close_cancels_queued_probes(queue_downloader, monkeypatch):
+    """Test that close() cancels probes still waiting for a worker."""
+    release = threading.Event()
+    started = []
+    def slow_probe(url):
+        started.append(url)
+        release.wait(5)
+        return True, "URL is accessible"
+    monkeypatch.setattr(queue_downloader, "verify_url_accessibility", slow_probe)
+
+    errors = []
+    def verify():
         try:
-            if test():
-                passed += 1
-            else:
-                print(f"Test {test.__name__} failed!")
-        except Exception as e:
-            print(f"Test {test.__name__} crashed: {e}")
-    
-    print("\n" + "=" * 60)
-    print(f"Test Results: {passed}/{total} tests passed")
-    
-    if passed == total:
-        print("✓ All tests passed! The application should work correctly.")
-    else:
-        print("✗ Some tests failed. Please check the errors above.")
-        print("Make sure all dependencies are installed correctly.")
-    
-    print("=" * 60)
-    
-    return passed == total
+            queue_downloader.verify_urls_accessibility([f"url {i}" for i in range(MAX_VERIFY_WORKERS + 2)])
+        except CancelledError as e:
+            errors.append(e)
+    caller = threading.Thread(target=verify)
+    caller.start()
+    deadline = time.monotonic() + 5
+    while len(started) < MAX_VERIFY_WORKERS and time.monotonic() < deadline:
+        time.sleep(0.01)
 
-if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1)
+    queue_downloader.close()
+    release.set()
+    caller.join()
+    assert len(started) == MAX_VERIFY_WORKERS
+    assert errors
+    assert not queue_downloader._verify_futures
 
+def test_close_releases_pooled_ydl(queue_downloader, monkeypatch):
+    """Test that close() closes the YoutubeDL instances pooled by every thread."""
+    closed = []
+    monkeypatch.setattr(yt_dlp.YoutubeDL, "close", lambda ydl: closed.append(ydl))
+    opts = {'quiet': True}
+    ydls = [queue_downloader._get_ydl(opts)]
+    worker = threading.Thread(target=lambda: ydls.append(queue_downloader._get_ydl(opts)))
+    worker.start()
+    worker.join()
+
+    assert queue_downloader._get_ydl(opts) is ydls[0]
+    assert ydls[0] is not ydls[1]
+    queue_downloader.close()
+    assert closed == ydls
+
+def test_export_results_schema(queue_downloader, tmp_path):
+    """Test that exported download results keep their documented fields only."""
+    queue_downloader.add_to_queue(["first song"])
+    export_path = tmp_path / "results.json"
+
+    queue_downloader.export_results(str(export_path))
+    exported = json.loads(export_path.read_text(encoding="utf-8"))
+
+    assert list(exported[0]) == ["url_or_query", "media_type", "quality", "status", "error_message",
+                                 "file_path", "title", "duration", "view_count"]
+    assert exported[0]["url_or_query"] == "first song"
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_json_helpers(monkeypatch, use_orjson):
+    """Test that the JSON helpers round-trip with and without orjson."""
+    if not use_orjson:
+        monkeypatch.setattr(common, "orjson", None)
+    data = {"title": "Déjà Vu", "view_count": 3}
+
+    assert loads_json(dumps_json(data)) == data
+    indented = dumps_json(data, indent=True)
+    assert indented.startswith(b'{\n  "title": "D\xc3\xa9j\xc3\xa0 Vu"')
+    assert loads_json(indented) == data
+
+def test_per_thread():
+    """Test that each thread gets its own object and the creating thread keeps the initial one."""
+    initial = object()
+    per_thread = PerThread(object, initial)
+    assert per_thread.get() is initial
+
+    seen = []
+    worker = threading.Thread(target=lambda: seen.extend([per_thread.get(), per_thread.get()]))
+    worker.start()
+    worker.join()
+    assert seen[0] is seen[1]
+    assert seen[0] is not initial
+
+def test_load_batch_from_file(downloader, tmp_path):
+    """Test that batch files are read one stripped item per line, skipping blank lines."""
+    batch_file = tmp_path / "batch.txt"
+    batch_file.write_text("  first song \n\nhttps://youtu.be/dQw4w9WgXcQ\r\n   \nlast", encoding="utf-8")
+
+    assert downloader.load_batch_from_file(str(batch_file)) == \
+        ["first song", "https://youtu.be/dQw4w9WgXcQ", "last"]
+    assert downloader.load_batch_from_file(str(tmp_path / "missing.txt")) == []
+
+@pytest.mark.parametrize("text, limit, expected", [
+    ("short", 10, "short"),
+    ("exactly10!", 10, "exactly10!"),
+    ("a bit too long", 10, "a bit too ..."),
+    ("", 5, "")
+])
+def test_clip(text, limit, expected):
+    """Test table cell truncation."""
+    assert _clip(text, limit) == expected
+
+class FakeTree:
+    """Just enough of a ttk.Treeview for VirtualTreeview: no header and 20-pixel rows."""
+
+    def __init__(self, visible_rows):
+        self.visible_rows = visible_rows
+        self.items = []
+        self.values = {}
+        self.tk = self
+        self._w = ".tree"
+
+    def call(self, widget, command, parent, index, id_option, iid, values_option, values):
+        self.items.insert(index, iid)
+        self.values[iid] = values
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.items.remove(iid)
+            del self.values[iid]
+
+    def exists(self, iid):
+        return iid in self.values
+
+    def item(self, iid, values):
+        self.values[iid] = values
+
+    def bbox(self, iid):
+        return (0, 0, 100, 20)
+
+    def winfo_height(self):
+        return 20 * self.visible_rows
+
+    def configure(self, **options):
+        pass
+
+    def bind(self, sequence, callback):
+        pass
+
+    def yview_moveto(self, fraction):
+        pass
+
+class FakeScrollbar:
+    """Records the last position VirtualTreeview gave the scrollbar."""
+
+    def configure(self, **options):
+        pass
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+def test_virtual_treeview_window():
+    """Test that only the rows in view become tree items as the table scrolls."""
+    tree, scrollbar = FakeTree(visible_rows=3), FakeScrollbar()
+    view = VirtualTreeview(tree, scrollbar)
+    view._row_height = 20
+
+    view.set_rows([(f"row {i}",) for i in range(10)])
+    assert tree.get_children() == ("0", "1", "2")
+    assert scrollbar.position == (0, 0.3)
+
+    view.yview("scroll", 1, "pages")
+    assert tree.get_children() == ("3", "4", "5")
+    assert tree.values["4"] == ("row 4",)
+
+    # Scrolling past the end stops at the last full page
+    view.yview("moveto", "0.95")
+    assert tree.get_children() == ("7", "8", "9")
+    assert scrollbar.position == (0.7, 1.0)
+
+def test_virtual_treeview_update_row():
+    """Test that row updates reach the tree only for rows in view."""
+    tree = FakeTree(visible_rows=2)
+    view = VirtualTreeview(tree, FakeScrollbar())
+    view._row_height = 20
+    view.set_rows([("a",), ("b",), ("c",)])
+
+    view.update_row(1, ("B",))
+    view.update_row(2, ("C",))
+    assert tree.values == {"0": ("a",), "1": ("B",)}
+    assert view.rows == [("a",), ("B",), ("C",)]
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"] + sys.argv[1:]))
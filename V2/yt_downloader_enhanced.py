@@ -1,17 +1,21 @@
 import os
-import json
 import re
-import sys
-import subprocess
+import string
 import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
 import yt_dlp
 from googleapiclient.discovery import build
 from termcolor import colored
 from mutagen.easyid3 import EasyID3
 
+from common import DATACLASS_SLOTS, PerThread, dumps_json
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,7 +27,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Upper bound on concurrent yt-dlp accessibility probes
+MAX_VERIFY_WORKERS = 8
+
+# Maximum number of IDs the YouTube Data API accepts in one videos.list call
+VIDEOS_LIST_BATCH_SIZE = 50
+
+# Hosts and ID alphabet for the common URL shapes, checked before falling back to the regexes
+YOUTUBE_HOSTS = frozenset({'youtube.com', 'm.youtube.com', 'youtu.be', 'youtube-nocookie.com'})
+VIDEO_ID_CHARS = frozenset(string.ascii_letters + string.digits + '-_')
+# Translation table that deletes every ID character, leaving only the invalid ones behind
+VIDEO_ID_DELETE_TABLE = str.maketrans('', '', ''.join(VIDEO_ID_CHARS))
+VIDEO_ID_PATH_PREFIXES = ('/embed/', '/v/', '/shorts/')
+
+# URL patterns are compiled once per process rather than on every call
+YOUTUBE_URL_RE = re.compile(
+    r'(https?://)?(www\.)?(youtube|youtu|youtube-nocookie)\.(com|be)/'
+    r'(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})'
+)
+URL_TOKEN_SEPARATORS_RE = re.compile(r'[/?&=#]')
+
+def _is_video_id(token: str) -> bool:
+    """Check whether a string is exactly one 11-character YouTube video ID."""
+    return len(token) == 11 and not token.translate(VIDEO_ID_DELETE_TABLE)
+
+# yt-dlp format selectors: audio ignores the quality, video maps the named presets
+AUDIO_FORMAT_SELECTOR = 'bestaudio/best'
+VIDEO_FORMAT_SELECTORS = {
+    'best': 'bestvideo+bestaudio/best',
+    'worst': 'worstvideo+worstaudio/worst'
+}
+
+@dataclass(**DATACLASS_SLOTS)
 class DownloadItem:
     """Represents a single download item with metadata."""
     url_or_query: str
@@ -35,8 +70,12 @@ class DownloadItem:
     title: str = ''
     duration: str = ''
     view_count: int = 0
+    is_url: Optional[bool] = None  # URL check made at enqueue time; None if not checked yet
+
+# DownloadItem fields used only for internal bookkeeping, left out of exported results
+INTERNAL_ITEM_FIELDS = frozenset({'is_url'})
     
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class QualityInfo:
     """Represents quality information for a video."""
     format_id: str
@@ -50,49 +89,130 @@ class QualityInfo:
 class YouTubeDownloaderEnhanced:
     """Enhanced YouTube downloader with batch processing and quality verification."""
     
-    def __init__(self, api_key: str, download_path: str):
+    def __init__(self, api_key: str, download_path: str, max_parallel: int = 3):
         self.api_key = api_key
         self.download_path = Path(download_path)
         self.download_path.mkdir(parents=True, exist_ok=True)
         self.youtube = build('youtube', 'v3', developerKey=api_key)
         self.download_queue: List[DownloadItem] = []
+        self.max_parallel = max_parallel
+        # Parallel downloads each get their own API client and YoutubeDL instances
+        self._youtube_clients = PerThread(lambda: build('youtube', 'v3', developerKey=api_key), self.youtube)
+        self._ydl_pools = PerThread(dict)
+        # Every pooled YoutubeDL across all threads, so close() can release them
+        self._ydl_instances: List[yt_dlp.YoutubeDL] = []
+        self._ydl_lock = threading.Lock()
+        # Successful accessibility probes, keyed by URL
+        self._probe_cache: Dict[str, Tuple[bool, str]] = {}
+        # Long-lived workers for probes, so their per-thread YoutubeDL instances are reused.
+        # Threads are only started when the first probe is submitted.
+        self._verify_executor = ThreadPoolExecutor(max_workers=MAX_VERIFY_WORKERS)
+        # Probes submitted but not finished yet, so close() can cancel the queued ones
+        self._verify_futures: set = set()
+        # Snapshot of filenames in the download directory, taken when a queue run starts
+        self._existing_files: Optional[set] = None
+        # Running per-status tallies for the queue, so status polls don't rescan it
+        self._status_counts: Counter = Counter()
+        # ids of the items the tallies cover, so items cleared mid-run no longer change them
+        self._counted_ids: set = set()
+        self._status_lock = threading.Lock()
+    
+    def close(self):
+        """Shut down the probe workers and pooled YoutubeDL instances; call once no longer used."""
+        # shutdown(cancel_futures=True) needs Python 3.9, so queued probes are cancelled here
+        for future in list(self._verify_futures):
+            future.cancel()
+        self._verify_executor.shutdown(wait=False)
+        with self._ydl_lock:
+            instances, self._ydl_instances = self._ydl_instances, []
+        for ydl in instances:
+            ydl.close()
+    
+    def _get_youtube_client(self):
+        """Get the YouTube API client owned by the calling thread."""
+        return self._youtube_clients.get()
+    
+    def _get_ydl(self, ydl_opts: Dict) -> yt_dlp.YoutubeDL:
+        """Get a reusable YoutubeDL for the given options, one per thread since it is not thread-safe."""
+        pool = self._ydl_pools.get()
+        key = repr(sorted(ydl_opts.items()))
+        ydl = pool.get(key)
+        if ydl is None:
+            # YoutubeDL adds its defaults to the dict it is given, so keep the caller's unchanged
+            ydl = pool[key] = yt_dlp.YoutubeDL(dict(ydl_opts))
+            with self._ydl_lock:
+                self._ydl_instances.append(ydl)
+        return ydl
+    
+    def _parse_video_id(self, url: str) -> Optional[str]:
+        """Extract the video ID from common YouTube URL shapes without using regexes."""
+        if '://' not in url:
+            url = 'https://' + url
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            return None
+        
+        host = parts.hostname or ''
+        if host.startswith('www.'):
+            host = host[4:]
+        if host not in YOUTUBE_HOSTS:
+            return None
+        
+        if host == 'youtu.be':
+            candidate = parts.path[1:]
+        elif parts.path == '/watch':
+            candidate = parse_qs(parts.query).get('v', [''])[0]
+        elif parts.path.startswith(VIDEO_ID_PATH_PREFIXES):
+            candidate = parts.path.split('/')[2]
+        else:
+            return None
         
+        if _is_video_id(candidate):
+            return candidate
+        return None
+    
     def validate_youtube_url(self, url: str) -> bool:
         """Validate if a URL is a valid YouTube URL."""
-        youtube_regex = re.compile(
-            r'(https?://)?(www\.)?(youtube|youtu|youtube-nocookie)\.(com|be)/'
-            r'(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})'
-        )
-        return bool(youtube_regex.match(url))
+        # Search queries and other sites can never match, so skip the parsing entirely
+        if 'youtu' not in url:
+            return False
+        if self._parse_video_id(url):
+            return True
+        return bool(YOUTUBE_URL_RE.match(url))
     
     def extract_video_id(self, url: str) -> Optional[str]:
         """Extract video ID from YouTube URL."""
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11}).*',
-            r'(?:embed\/)([0-9A-Za-z_-]{11})',
-            r'(?:v\/)([0-9A-Za-z_-]{11})'
-        ]
+        video_id = self._parse_video_id(url)
+        if video_id:
+            return video_id
         
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
+        # Otherwise take the first URL component that looks like an ID
+        for token in URL_TOKEN_SEPARATORS_RE.split(url):
+            if _is_video_id(token):
+                return token
         return None
     
     def get_video_info(self, video_id: str) -> Optional[Dict]:
         """Get video information using YouTube API."""
-        try:
-            response = self.youtube.videos().list(
-                part='snippet,statistics,contentDetails',
-                id=video_id
-            ).execute()
-            
-            if response['items']:
-                return response['items'][0]
-            return None
-        except Exception as e:
-            logger.error(f"Error fetching video info for {video_id}: {e}")
-            return None
+        return self.get_videos_info([video_id]).get(video_id)
+    
+    def get_videos_info(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Get video information for many videos, requesting up to 50 IDs per API call."""
+        videos_info = {}
+        for start in range(0, len(video_ids), VIDEOS_LIST_BATCH_SIZE):
+            batch = video_ids[start:start + VIDEOS_LIST_BATCH_SIZE]
+            try:
+                response = self._get_youtube_client().videos().list(
+                    part='snippet,statistics,contentDetails',
+                    id=','.join(batch)
+                ).execute()
+                
+                for item in response['items']:
+                    videos_info[item['id']] = item
+            except Exception as e:
+                logger.error(f"Error fetching video info for {', '.join(batch)}: {e}")
+        return videos_info
     
     def get_available_qualities(self, url: str) -> List[QualityInfo]:
         """Get available quality options for a video."""
@@ -103,54 +223,72 @@ class YouTubeDownloaderEnhanced:
         }
         
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                formats = info.get('formats', [])
-                
-                quality_list = []
-                for fmt in formats:
-                    if fmt.get('vcodec') != 'none' or fmt.get('acodec') != 'none':
-                        quality_info = QualityInfo(
-                            format_id=fmt.get('format_id', ''),
-                            ext=fmt.get('ext', ''),
-                            resolution=fmt.get('resolution', 'audio only'),
-                            filesize=fmt.get('filesize'),
-                            fps=fmt.get('fps'),
-                            vcodec=fmt.get('vcodec', 'none'),
-                            acodec=fmt.get('acodec', 'none')
-                        )
-                        quality_list.append(quality_info)
-                
-                return quality_list
+            info = self._get_ydl(ydl_opts).extract_info(url, download=False)
+            formats = info.get('formats', [])
+            
+            quality_list = []
+            for fmt in formats:
+                if fmt.get('vcodec') != 'none' or fmt.get('acodec') != 'none':
+                    quality_info = QualityInfo(
+                        format_id=fmt.get('format_id', ''),
+                        ext=fmt.get('ext', ''),
+                        resolution=fmt.get('resolution', 'audio only'),
+                        filesize=fmt.get('filesize'),
+                        fps=fmt.get('fps'),
+                        vcodec=fmt.get('vcodec', 'none'),
+                        acodec=fmt.get('acodec', 'none')
+                    )
+                    quality_list.append(quality_info)
+            
+            return quality_list
         except Exception as e:
             logger.error(f"Error getting qualities for {url}: {e}")
             return []
     
     def verify_url_accessibility(self, url: str) -> Tuple[bool, str]:
         """Verify if a YouTube URL is accessible and downloadable."""
+        cached = self._probe_cache.get(url)
+        if cached:
+            return cached
+        
         try:
+            # Only the extractor's metadata is needed here: playlist entries are left unresolved and
+            # format selection is skipped. Full format listing stays in get_available_qualities.
             ydl_opts = {
                 'quiet': True,
                 'no_warnings': True,
-                'simulate': True
+                'skip_download': True,
+                'extract_flat': 'in_playlist'
             }
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                if info:
-                    return True, "URL is accessible"
-                else:
-                    return False, "Unable to extract video information"
-                    
+            info = self._get_ydl(ydl_opts).extract_info(url, download=False, process=False)
+            if info and 'id' in info:
+                # Only successes are cached so transient failures can be retried
+                self._probe_cache[url] = (True, "URL is accessible")
+                return self._probe_cache[url]
+            else:
+                return False, "Unable to extract video information"
+                
         except yt_dlp.DownloadError as e:
             return False, f"Download error: {str(e)}"
         except Exception as e:
             return False, f"Unexpected error: {str(e)}"
     
+    def verify_urls_accessibility(self, urls: List[str]) -> List[Tuple[bool, str]]:
+        """Verify several URLs concurrently, returning results in the same order."""
+        if not urls:
+            return []
+        # Each probe is a network round trip, so overlap them on the shared worker threads
+        futures = [self._verify_executor.submit(self.verify_url_accessibility, url) for url in urls]
+        for future in futures:
+            self._verify_futures.add(future)
+            future.add_done_callback(self._verify_futures.discard)
+        return [future.result() for future in futures]
+    
     def search_youtube(self, query: str, max_results: int = 15) -> List[Dict]:
         """Search YouTube for videos and return results with quality verification."""
         try:
-            search_response = self.youtube.search().list(
+            search_response = self._get_youtube_client().search().list(
                 q=query,
                 type='video',
                 part='id,snippet',
@@ -158,13 +296,16 @@ class YouTubeDownloaderEnhanced:
                 order='relevance'
             ).execute()
             
+            items = search_response.get('items', [])
+            video_urls = [f"https://www.youtube.com/watch?v={item['id']['videoId']}" for item in items]
+            
+            # Verify accessibility and fetch API details for all results at once
+            accessibility = self.verify_urls_accessibility(video_urls)
+            videos_info = self.get_videos_info([item['id']['videoId'] for item in items])
+            
             videos = []
-            for item in search_response.get('items', []):
+            for item, video_url, (is_accessible, message) in zip(items, video_urls, accessibility):
                 video_id = item['id']['videoId']
-                video_url = f"https://www.youtube.com/watch?v={video_id}"
-                
-                # Verify accessibility
-                is_accessible, message = self.verify_url_accessibility(video_url)
                 
                 video_info = {
                     'title': item['snippet']['title'],
@@ -176,8 +317,8 @@ class YouTubeDownloaderEnhanced:
                     'access_message': message
                 }
                 
-                # Get additional info from API
-                api_info = self.get_video_info(video_id)
+                # Add details from the batched API lookup
+                api_info = videos_info.get(video_id)
                 if api_info:
                     video_info.update({
                         'duration': api_info['contentDetails']['duration'],
@@ -197,6 +338,8 @@ class YouTubeDownloaderEnhanced:
     
     def add_to_queue(self, items: List[str], media_type: str = 'audio', quality: str = 'best'):
         """Add items to download queue with validation."""
+        download_items = []
+        url_items = []
         for item in items:
             item = item.strip()
             if not item:
@@ -207,23 +350,35 @@ class YouTubeDownloaderEnhanced:
                 media_type=media_type,
                 quality=quality
             )
+            download_items.append(download_item)
             
             # Validate if it's a URL
-            if self.validate_youtube_url(item):
-                is_accessible, message = self.verify_url_accessibility(item)
-                if not is_accessible:
-                    download_item.status = 'failed'
-                    download_item.error_message = f"URL validation failed: {message}"
-                    logger.warning(f"Invalid URL {item}: {message}")
-            
-            self.download_queue.append(download_item)
-            logger.info(f"Added to queue: {item}")
+            download_item.is_url = self.validate_youtube_url(item)
+            if download_item.is_url:
+                url_items.append(download_item)
+        
+        # Probe all URLs concurrently
+        accessibility = self.verify_urls_accessibility([d.url_or_query for d in url_items])
+        for download_item, (is_accessible, message) in zip(url_items, accessibility):
+            if not is_accessible:
+                download_item.status = 'failed'
+                download_item.error_message = f"URL validation failed: {message}"
+                logger.warning(f"Invalid URL {download_item.url_or_query}: {message}")
+        
+        # Pool threads update the tallies while the GUI may still be adding items
+        with self._status_lock:
+            for download_item in download_items:
+                self.download_queue.append(download_item)
+                self._status_counts[download_item.status] += 1
+                self._counted_ids.add(id(download_item))
+        for download_item in download_items:
+            logger.info(f"Added to queue: {download_item.url_or_query}")
     
     def load_batch_from_file(self, file_path: str) -> List[str]:
         """Load batch items from a text file."""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                items = [line.strip() for line in f.readlines() if line.strip()]
+                items = [line for line in (raw.strip() for raw in f) if line]
             logger.info(f"Loaded {len(items)} items from {file_path}")
             return items
         except Exception as e:
@@ -232,21 +387,24 @@ class YouTubeDownloaderEnhanced:
     
     def download_single_item(self, item: DownloadItem) -> bool:
         """Download a single item from the queue."""
-        item.status = 'processing'
+        self._set_status(item, 'processing')
         
         try:
+            if item.is_url is None:
+                item.is_url = self.validate_youtube_url(item.url_or_query)
+            
             # If it's not a URL, search for it
-            if not self.validate_youtube_url(item.url_or_query):
+            if not item.is_url:
                 search_results = self.search_youtube(item.url_or_query, max_results=5)
                 if not search_results:
-                    item.status = 'failed'
+                    self._set_status(item, 'failed')
                     item.error_message = 'No search results found'
                     return False
                 
                 # Use the first accessible result
                 accessible_results = [r for r in search_results if r['accessible']]
                 if not accessible_results:
-                    item.status = 'failed'
+                    self._set_status(item, 'failed')
                     item.error_message = 'No accessible videos found in search results'
                     return False
                 
@@ -258,20 +416,21 @@ class YouTubeDownloaderEnhanced:
             # Set up yt-dlp options
             output_template = str(self.download_path / '%(title)s.%(ext)s')
             
+            is_audio = item.media_type == 'audio'
             ydl_opts = {
                 'format': self._get_format_selector(item.media_type, item.quality),
                 'outtmpl': output_template,
                 'noplaylist': True,
-                'extractaudio': item.media_type == 'audio',
-                'audioformat': 'mp3' if item.media_type == 'audio' else None,
-                'audioquality': '192' if item.media_type == 'audio' else None,
+                'extractaudio': is_audio,
+                'audioformat': 'mp3' if is_audio else None,
+                'audioquality': '192' if is_audio else None,
                 'retries': 3,
                 'fragment_retries': 3,
                 'ignoreerrors': False,
                 'no_warnings': False
             }
             
-            if item.media_type == 'audio':
+            if is_audio:
                 ydl_opts['postprocessors'] = [{
                     'key': 'FFmpegExtractAudio',
                     'preferredcodec': 'mp3',
@@ -284,133 +443,162 @@ class YouTubeDownloaderEnhanced:
                 expected_filename = ydl.prepare_filename(info)
                 
                 # Check if file already exists
-                if os.path.exists(expected_filename):
+                if self._file_exists(expected_filename):
                     logger.info(f"File already exists: {expected_filename}")
                     item.file_path = expected_filename
-                    item.status = 'completed'
+                    self._set_status(item, 'completed')
                     return True
                 
-                # Download the file
-                ydl.download([video_url])
+                # Download from the info extracted above instead of extracting the URL again
+                info = ydl.process_ie_result(ydl.sanitize_info(info, remove_private_keys=True), download=True)
                 
                 # Update item info
                 item.title = info.get('title', '')
                 item.duration = info.get('duration_string', '')
                 item.view_count = info.get('view_count', 0)
                 item.file_path = expected_filename
-                item.status = 'completed'
+                self._set_status(item, 'completed')
+                if self._existing_files is not None:
+                    self._existing_files.add(os.path.basename(expected_filename))
                 
                 logger.info(f"Successfully downloaded: {item.title}")
                 return True
                 
         except Exception as e:
-            item.status = 'failed'
+            self._set_status(item, 'failed')
             item.error_message = str(e)
             logger.error(f"Error downloading {item.url_or_query}: {e}")
             return False
     
-    def _get_format_selector(self, media_type: str, quality: str) -> str:
+    def _set_status(self, item: DownloadItem, status: str):
+        """Move a queued item to a new status and keep the running tallies in step."""
+        with self._status_lock:
+            if id(item) in self._counted_ids:
+                self._status_counts[item.status] -= 1
+                self._status_counts[status] += 1
+            item.status = status
+    
+    def _file_exists(self, file_path: str) -> bool:
+        """Check for a downloaded file, using the directory snapshot when one was taken."""
+        if self._existing_files is not None and os.path.dirname(file_path) == str(self.download_path):
+            return os.path.basename(file_path) in self._existing_files
+        return os.path.exists(file_path)
+    
+    @staticmethod
+    def _get_format_selector(media_type: str, quality: str) -> str:
         """Get format selector string for yt-dlp."""
         if media_type == 'audio':
-            return 'bestaudio/best'
-        elif quality == 'best':
-            return 'bestvideo+bestaudio/best'
-        elif quality == 'worst':
-            return 'worstvideo+worstaudio/worst'
-        else:
-            # Assume quality is a specific format
-            return quality
+            return AUDIO_FORMAT_SELECTOR
+        # Any other quality is assumed to be a specific format
+        return VIDEO_FORMAT_SELECTORS.get(quality, quality)
     
-    def process_queue(self, progress_callback=None) -> Dict[str, int]:
-        """Process all items in the download queue."""
+    def process_queue(self, progress_callback=None, stop_event: Optional[threading.Event] = None,
+                      item_callback=None) -> Dict[str, int]:
+        """Process all items in the download queue.
+        
+        Only pending items are downloaded, so a run resumed after a stop skips the items that
+        already finished. Once stop_event is set, items that have not started yet are left
+        pending; downloads already running are allowed to finish. item_callback, if given,
+        receives each DownloadItem as it finishes, just before progress_callback is called.
+        """
         results = {'completed': 0, 'failed': 0, 'total': len(self.download_queue)}
         
-        for i, item in enumerate(self.download_queue):
-            if item.status == 'failed':
-                results['failed'] += 1
-                continue
-                
-            if progress_callback:
-                progress_callback(i + 1, results['total'], item.url_or_query)
-            
-            success = self.download_single_item(item)
-            if success:
-                results['completed'] += 1
-            else:
-                results['failed'] += 1
+        pending = [item for item in self.download_queue if item.status == 'pending']
+        for item in self.download_queue:
+            if item.status in ('completed', 'failed'):
+                results[item.status] += 1
+        if not pending:
+            return results
+        
+        # List the download directory once instead of checking each expected file separately
+        self._existing_files = {entry.name for entry in os.scandir(self.download_path)}
+        
+        # Downloads are network-bound, so run up to max_parallel of them at once
+        finished = results['total'] - len(pending)
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(pending))) as executor:
+                futures = {executor.submit(self._download_unless_stopped, item, stop_event): item
+                           for item in pending}
+                for future in as_completed(futures):
+                    if stop_event is not None and stop_event.is_set():
+                        for queued in futures:
+                            queued.cancel()
+                    if future.cancelled() or future.result() is None:
+                        continue
+                    item = futures[future]
+                    finished += 1
+                    if item_callback:
+                        item_callback(item)
+                    if progress_callback:
+                        progress_callback(finished, results['total'], item.url_or_query)
+                    
+                    if future.result():
+                        results['completed'] += 1
+                    else:
+                        results['failed'] += 1
+        finally:
+            self._existing_files = None
         
         return results
     
+    def _download_unless_stopped(self, item: DownloadItem,
+                                 stop_event: Optional[threading.Event]) -> Optional[bool]:
+        """Download an item unless the run was stopped first, in which case it stays pending."""
+        # A worker picks up the next item as soon as it is free, before process_queue can cancel it
+        if stop_event is not None and stop_event.is_set():
+            return None
+        return self.download_single_item(item)
+    
     def get_queue_status(self) -> Dict:
         """Get current status of the download queue."""
-        status = {
-            'total': len(self.download_queue),
-            'pending': 0,
-            'processing': 0,
-            'completed': 0,
-            'failed': 0
-        }
-        
-        for item in self.download_queue:
-            status[item.status] += 1
-        
-        return status
+        with self._status_lock:
+            return {
+                'total': len(self.download_queue),
+                'pending': self._status_counts['pending'],
+                'processing': self._status_counts['processing'],
+                'completed': self._status_counts['completed'],
+                'failed': self._status_counts['failed']
+            }
     
     def clear_queue(self):
         """Clear the download queue."""
-        self.download_queue.clear()
+        with self._status_lock:
+            self.download_queue.clear()
+            self._status_counts.clear()
+            self._counted_ids.clear()
         logger.info("Download queue cleared")
     
     def export_results(self, file_path: str):
         """Export download results to a JSON file."""
-        results = []
-        for item in self.download_queue:
-            results.append({
-                'url_or_query': item.url_or_query,
-                'media_type': item.media_type,
-                'quality': item.quality,
-                'status': item.status,
-                'error_message': item.error_message,
-                'file_path': item.file_path,
-                'title': item.title,
-                'duration': item.duration,
-                'view_count': item.view_count
-            })
+        results = [{key: value for key, value in asdict(item).items() if key not in INTERNAL_ITEM_FIELDS}
+                   for item in self.download_queue]
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            data = dumps_json(results, indent=True)
+            with open(file_path, 'wb') as f:
+                f.write(data)
             logger.info(f"Results exported to {file_path}")
         except Exception as e:
             logger.error(f"Error exporting results: {e}")
 
-def install_dependencies():
-    """Install required dependencies."""
-    packages = {
-        'google-api-python-client': 'googleapiclient',
-        'termcolor': 'termcolor',
-        'mutagen': 'mutagen',
-        'yt-dlp': 'yt_dlp'
-    }
-    
-    print(colored("Checking and installing dependencies...", 'yellow'))
-    for package_name, import_name in packages.items():
-        try:
-            __import__(import_name)
-            print(colored(f"{package_name} is already installed.", 'green'))
-        except ImportError:
-            print(colored(f"{package_name} not found. Installing...", 'yellow'))
-            try:
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', package_name])
-                print(colored(f"Successfully installed {package_name}.", 'green'))
-            except subprocess.CalledProcessError as e:
-                print(colored(f"Failed to install {package_name}: {e}", 'red'))
-                sys.exit(1)
+# Static CLI text is colored once at import instead of on every menu redraw or progress tick
+MENU_TEXT = '\n'.join([colored("\n=== YouTube Downloader Enhanced ===", 'green')] + [
+    colored(line, 'white') for line in (
+        "1. Add single URL/query",
+        "2. Load batch from file",
+        "3. Add multiple items (manual entry)",
+        "4. View queue status",
+        "5. Process queue",
+        "6. Clear queue",
+        "7. Export results",
+        "8. Exit",
+    )
+])
+MENU_PROMPT = colored("Select option: ", 'cyan')
+PROGRESS_LINE = colored("Finished {}/{}: {}", 'blue')
 
 def main():
     """Main function for command-line usage."""
-    install_dependencies()
-    
     # Get API key and download path
     api_key = input(colored("Enter your YouTube Data API key: ", 'cyan'))
     download_path = input(colored("Enter download directory: ", 'cyan'))
@@ -419,17 +607,9 @@ def main():
     downloader = YouTubeDownloaderEnhanced(api_key, download_path)
     
     while True:
-        print(colored("\n=== YouTube Downloader Enhanced ===", 'green'))
-        print(colored("1. Add single URL/query", 'white'))
-        print(colored("2. Load batch from file", 'white'))
-        print(colored("3. Add multiple items (manual entry)", 'white'))
-        print(colored("4. View queue status", 'white'))
-        print(colored("5. Process queue", 'white'))
-        print(colored("6. Clear queue", 'white'))
-        print(colored("7. Export results", 'white'))
-        print(colored("8. Exit", 'white'))
+        print(MENU_TEXT)
         
-        choice = input(colored("Select option: ", 'cyan'))
+        choice = input(MENU_PROMPT)
         
         if choice == '1':
             item = input(colored("Enter YouTube URL or search query: ", 'cyan'))
@@ -465,7 +645,7 @@ def main():
                 continue
                 
             def progress_callback(current, total, item):
-                print(colored(f"Processing {current}/{total}: {item}", 'blue'))
+                print(PROGRESS_LINE.format(current, total, item))
             
             results = downloader.process_queue(progress_callback)
             print(colored(f"Download completed: {results}", 'green'))
@@ -483,6 +663,8 @@ def main():
             
         else:
             print(colored("Invalid option!", 'red'))
+    
+    downloader.close()
 
 if __name__ == "__main__":
     main()
@@ -1,18 +1,166 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+import tkinter.font as tkfont
 import threading
 import os
-import json
+import mmap
+import operator
 from pathlib import Path
+from contextlib import closing
 import queue
 import logging
+import logging.handlers
 from typing import List, Dict, Optional
 import webbrowser
 
 # Import our custom modules
 from yt_downloader_enhanced import YouTubeDownloaderEnhanced, DownloadItem
 from spotify_to_youtube import SpotifyToYouTubeConverter
+from common import dumps_json, loads_json
 
+# Download directory used until settings say otherwise; the home directory is looked up once
+DEFAULT_DOWNLOAD_PATH = str(Path.home() / "Downloads" / "YouTube")
+
+# Number of downloads the queue runs at once
+DOWNLOAD_WORKERS = 4
+
+# Batch files larger than this are only previewed in the text box and read from disk when queued
+BATCH_PREVIEW_BYTES = 64 * 1024
+
+# Fields shown in the Spotify table, fetched from a track in one call
+_TRACK_FIELDS = operator.attrgetter('title', 'artist', 'album', 'youtube_url', 'verification_status')
+
+# Suffix for table cells, indexed by whether the text was cut
+_CLIP_SUFFIX = ("", "...")
+
+def _clip(text: str, limit: int) -> str:
+    """Truncate text for a table cell, marking cut text with an ellipsis."""
+    return text[:limit] + _CLIP_SUFFIX[len(text) > limit]
+
+def _queue_row(item: DownloadItem) -> tuple:
+    """Build the queue table row for a download item; the Progress column is a placeholder."""
+    return (_clip(item.url_or_query, 50), item.media_type, item.status, "", _clip(item.file_path, 50))
+
+class VirtualTreeview:
+    """Drives a Treeview so it only holds Tk items for the rows currently in view.
+    
+    The full table lives in ``rows`` as value tuples; scrolling moves a window over it and
+    only the rows entering or leaving that window are inserted or deleted. Tree item IDs
+    are the row indices as strings.
+    """
+    
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rows: List[tuple] = []
+        self.first = 0
+        self._row_height = 0
+        self._header_height = 0
+        self._redraw_pending = False
+        
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand='')
+        tree.bind('<Configure>', lambda e: self.schedule_redraw())
+        tree.bind('<MouseWheel>', self._on_mousewheel)
+        tree.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        tree.bind('<Button-5>', lambda e: self._scroll_by(3))
+        
+    def set_rows(self, rows: List[tuple]):
+        """Replace the table contents and redraw the visible window."""
+        self.rows = rows
+        visible = self.tree.get_children()
+        if visible:
+            self.tree.delete(*visible)
+        self.redraw()
+        
+    def append_rows(self, rows: List[tuple]):
+        """Add rows to the end of the table; only those that land in view are inserted."""
+        self.rows.extend(rows)
+        self.schedule_redraw()
+        
+    def update_row(self, index: int, values: tuple):
+        """Replace one row, touching the Treeview only if that row is in view."""
+        self.rows[index] = values
+        iid = str(index)
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=values)
+            
+    def yview(self, *args):
+        """Scrollbar command: handles 'moveto fraction' and 'scroll n units|pages'."""
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * len(self.rows))
+            self.redraw()
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            self._scroll_by(step * self._page_size() if args[2] == 'pages' else step)
+            
+    def schedule_redraw(self):
+        """Redraw once when Tk is idle, however many times this is called before then."""
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.tree.after_idle(self.redraw)
+            
+    def redraw(self):
+        """Bring the Treeview items in line with the current scroll window."""
+        self._redraw_pending = False
+        total = len(self.rows)
+        page = self._page_size()
+        self.first = max(0, min(self.first, total - page))
+        last = min(self.first + page, total)
+        
+        # Drop rows that scrolled out, then insert the ones that scrolled in at their position
+        shown = set()
+        stale = []
+        for iid in self.tree.get_children():
+            if self.first <= int(iid) < last:
+                shown.add(int(iid))
+            else:
+                stale.append(iid)
+        if stale:
+            self.tree.delete(*stale)
+        # Call the Tcl command directly; ttk's insert() wrapper re-formats its options on every call
+        tk_call, widget, rows = self.tree.tk.call, self.tree._w, self.rows
+        for index in range(self.first, last):
+            if index not in shown:
+                tk_call(widget, 'insert', '', index - self.first, '-id', str(index), '-values', rows[index])
+                
+        # Keep the Treeview's own view at the top; scrolling is done by moving the window
+        self.tree.yview_moveto(0)
+        self._measure_rows()
+        if total:
+            self.scrollbar.set(self.first / total, last / total)
+        else:
+            self.scrollbar.set(0, 1)
+            
+    def _scroll_by(self, rows: int):
+        self.first += rows
+        self.redraw()
+        return 'break'
+        
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        notches = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self._scroll_by(-3 * notches)
+        
+    def _measure_rows(self):
+        """Learn the header and row heights from the first rendered row."""
+        if self._row_height:
+            return
+        children = self.tree.get_children()
+        bbox = self.tree.bbox(children[0]) if children else ''
+        if bbox:
+            self._header_height = bbox[1]
+            self._row_height = bbox[3]
+            
+    def _page_size(self) -> int:
+        """Number of rows that fit in the widget's current height."""
+        row_height = self._row_height or tkfont.Font(root=self.tree, name='TkDefaultFont', exists=True).metrics('linespace')
+        height = self.tree.winfo_height() - self._header_height
+        if height <= 1:
+            # Not laid out yet, so fall back to the configured height in rows
+            return int(self.tree.cget('height'))
+        return max(1, height // row_height)
+        
 class YouTubeDownloaderGUI:
     """Production-ready GUI for YouTube Downloader with Spotify integration."""
     
@@ -22,15 +170,38 @@ class YouTubeDownloaderGUI:
         self.root.geometry("1000x700")
         self.root.minsize(800, 600)
         
-        # Configure style
+        # Configure style; the one Style and default Font instance are shared by every tab
         self.style = ttk.Style()
         self.style.theme_use('clam')
+        self.font = tkfont.nametofont('TkDefaultFont')
+        self.style.configure('Treeview', font=self.font, rowheight=self.font.metrics('linespace') + 4)
         
         # Initialize variables
         self.downloader = None
         self.spotify_converter = None
-        self.download_queue = queue.Queue()
         self.is_downloading = False
+        # Set by Pause so the running queue stops starting new downloads
+        self._stop_event = threading.Event()
+        # Created with the Queue tab, which is only built once it is first opened
+        self.queue_view: Optional[VirtualTreeview] = None
+        # Queue table row of each DownloadItem, keyed by id(), so finished items redraw only their row
+        self._queue_row_index: Dict[int, int] = {}
+        # Latest progress from the download thread, drawn by at most one pending idle callback
+        self._progress_state = None
+        self._finished_items: List[DownloadItem] = []
+        self._progress_pending = False
+        self._progress_lock = threading.Lock()
+        # Parsed settings.json and the mtime it was read at, so unchanged files are not parsed again
+        self._settings_cache: Optional[Dict] = None
+        self._settings_mtime: Optional[float] = None
+        # Memory map of a batch file too large to load into the text box
+        self._batch_mmap: Optional[mmap.mmap] = None
+        # How far into the GUI log file the Logs tab has already read
+        self._log_tail_pos = 0
+        # Token of the Spotify playlist load in progress; pages from an older load are dropped
+        self._playlist_load = None
+        # Default media type from Settings, kept as a plain str so it is read without Tcl
+        self._default_media_type = "audio"
         
         # Setup logging
         self.setup_logging()
@@ -41,14 +212,26 @@ class YouTubeDownloaderGUI:
         
     def setup_logging(self):
         """Setup logging for the GUI application."""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('yt_downloader_gui.log'),
-                logging.StreamHandler()
-            ]
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler('yt_downloader_gui.log')
+        file_handler.setFormatter(formatter)
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        
+        # Records are written by a listener thread so Tk callbacks never wait on file or console I/O.
+        # Handlers already installed by the imported modules move behind the listener as well.
+        root_logger = logging.getLogger()
+        handlers = root_logger.handlers[:] or [stream_handler]
+        for handler in root_logger.handlers[:]:
+            root_logger.removeHandler(handler)
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        root_logger.setLevel(logging.INFO)
+        
+        self.log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, *handlers, respect_handler_level=True
         )
+        self.log_listener.start()
         self.logger = logging.getLogger(__name__)
         
     def create_widgets(self):
@@ -57,13 +240,25 @@ class YouTubeDownloaderGUI:
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Create tabs
+        # Create tabs; only Settings is built now, the others fill their frame when first selected
         self.create_settings_tab()
-        self.create_downloader_tab()
-        self.create_spotify_tab()
-        self.create_batch_tab()
-        self.create_queue_tab()
-        self.create_logs_tab()
+        self._tab_builders = {}
+        for text, builder in (("Download", self.create_downloader_tab),
+                              ("Spotify", self.create_spotify_tab),
+                              ("Batch", self.create_batch_tab),
+                              ("Queue", self.create_queue_tab),
+                              ("Logs", self.create_logs_tab)):
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=text)
+            self._tab_builders[str(frame)] = builder
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
+        
+    def _on_tab_changed(self, event):
+        """Build a tab's widgets the first time it is selected."""
+        tab = str(self.notebook.select())
+        builder = self._tab_builders.pop(tab, None)
+        if builder:
+            builder(self.notebook.nametowidget(tab))
         
     def create_settings_tab(self):
         """Create the settings configuration tab."""
@@ -76,21 +271,18 @@ class YouTubeDownloaderGUI:
         
         # YouTube API Key
         ttk.Label(api_frame, text="YouTube Data API Key:").grid(row=0, column=0, sticky=tk.W, pady=2)
-        self.youtube_api_var = tk.StringVar()
-        youtube_entry = ttk.Entry(api_frame, textvariable=self.youtube_api_var, width=50, show="*")
-        youtube_entry.grid(row=0, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
+        self.youtube_api_entry = ttk.Entry(api_frame, width=50, show="*")
+        self.youtube_api_entry.grid(row=0, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
         
         # Spotify Client ID
         ttk.Label(api_frame, text="Spotify Client ID:").grid(row=1, column=0, sticky=tk.W, pady=2)
-        self.spotify_id_var = tk.StringVar()
-        spotify_id_entry = ttk.Entry(api_frame, textvariable=self.spotify_id_var, width=50)
-        spotify_id_entry.grid(row=1, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
+        self.spotify_id_entry = ttk.Entry(api_frame, width=50)
+        self.spotify_id_entry.grid(row=1, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
         
         # Spotify Client Secret
         ttk.Label(api_frame, text="Spotify Client Secret:").grid(row=2, column=0, sticky=tk.W, pady=2)
-        self.spotify_secret_var = tk.StringVar()
-        spotify_secret_entry = ttk.Entry(api_frame, textvariable=self.spotify_secret_var, width=50, show="*")
-        spotify_secret_entry.grid(row=2, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
+        self.spotify_secret_entry = ttk.Entry(api_frame, width=50, show="*")
+        self.spotify_secret_entry.grid(row=2, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
         
         api_frame.columnconfigure(1, weight=1)
         
@@ -100,16 +292,18 @@ class YouTubeDownloaderGUI:
         
         # Download path
         ttk.Label(download_frame, text="Download Directory:").grid(row=0, column=0, sticky=tk.W, pady=2)
-        self.download_path_var = tk.StringVar(value=str(Path.home() / "Downloads" / "YouTube"))
         path_frame = ttk.Frame(download_frame)
         path_frame.grid(row=0, column=1, padx=5, pady=2, sticky=tk.W+tk.E)
         
-        ttk.Entry(path_frame, textvariable=self.download_path_var, width=40).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.download_path_entry = ttk.Entry(path_frame, width=40)
+        self.download_path_entry.insert(0, DEFAULT_DOWNLOAD_PATH)
+        self.download_path_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Button(path_frame, text="Browse", command=self.browse_download_path).pack(side=tk.RIGHT, padx=(5, 0))
         
         # Default media type
         ttk.Label(download_frame, text="Default Media Type:").grid(row=1, column=0, sticky=tk.W, pady=2)
         self.media_type_var = tk.StringVar(value="audio")
+        self.media_type_var.trace_add('write', self._on_default_media_changed)
         media_combo = ttk.Combobox(download_frame, textvariable=self.media_type_var, values=["audio", "video"], state="readonly")
         media_combo.grid(row=1, column=1, padx=5, pady=2, sticky=tk.W)
         
@@ -123,27 +317,23 @@ class YouTubeDownloaderGUI:
         ttk.Button(button_frame, text="Test Connection", command=self.test_connection).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Help", command=self.show_help).pack(side=tk.RIGHT, padx=5)
         
-    def create_downloader_tab(self):
+    def create_downloader_tab(self, downloader_frame):
         """Create the main downloader tab."""
-        downloader_frame = ttk.Frame(self.notebook)
-        self.notebook.add(downloader_frame, text="Download")
-        
         # Input section
         input_frame = ttk.LabelFrame(downloader_frame, text="Single Download", padding=10)
         input_frame.pack(fill=tk.X, padx=10, pady=5)
         
         ttk.Label(input_frame, text="YouTube URL or Search Query:").pack(anchor=tk.W)
-        self.url_var = tk.StringVar()
-        url_entry = ttk.Entry(input_frame, textvariable=self.url_var, width=80)
-        url_entry.pack(fill=tk.X, pady=5)
-        url_entry.bind('<Return>', lambda e: self.add_single_download())
+        self.url_entry = ttk.Entry(input_frame, width=80)
+        self.url_entry.pack(fill=tk.X, pady=5)
+        self.url_entry.bind('<Return>', lambda e: self.add_single_download())
         
         # Options
         options_frame = ttk.Frame(input_frame)
         options_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(options_frame, text="Type:").pack(side=tk.LEFT)
-        self.single_media_var = tk.StringVar(value="audio")
+        self.single_media_var = tk.StringVar(value=self._default_media_type)
         ttk.Radiobutton(options_frame, text="Audio", variable=self.single_media_var, value="audio").pack(side=tk.LEFT, padx=5)
         ttk.Radiobutton(options_frame, text="Video", variable=self.single_media_var, value="video").pack(side=tk.LEFT, padx=5)
         
@@ -163,9 +353,10 @@ class YouTubeDownloaderGUI:
             self.search_tree.column(col, width=150)
         
         # Scrollbars for search results
-        search_scroll_y = ttk.Scrollbar(search_frame, orient=tk.VERTICAL, command=self.search_tree.yview)
+        search_scroll_y = ttk.Scrollbar(search_frame, orient=tk.VERTICAL)
         search_scroll_x = ttk.Scrollbar(search_frame, orient=tk.HORIZONTAL, command=self.search_tree.xview)
-        self.search_tree.configure(yscrollcommand=search_scroll_y.set, xscrollcommand=search_scroll_x.set)
+        self.search_tree.configure(xscrollcommand=search_scroll_x.set)
+        self.search_view = VirtualTreeview(self.search_tree, search_scroll_y)
         
         self.search_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         search_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
@@ -178,19 +369,15 @@ class YouTubeDownloaderGUI:
         ttk.Button(search_buttons, text="Add Selected", command=self.add_selected_search_result).pack(side=tk.LEFT, padx=5)
         ttk.Button(search_buttons, text="Preview", command=self.preview_selected).pack(side=tk.LEFT, padx=5)
         
-    def create_spotify_tab(self):
+    def create_spotify_tab(self, spotify_frame):
         """Create the Spotify integration tab."""
-        spotify_frame = ttk.Frame(self.notebook)
-        self.notebook.add(spotify_frame, text="Spotify")
-        
         # Spotify playlist input
         playlist_frame = ttk.LabelFrame(spotify_frame, text="Spotify Playlist", padding=10)
         playlist_frame.pack(fill=tk.X, padx=10, pady=5)
         
         ttk.Label(playlist_frame, text="Spotify Playlist URL:").pack(anchor=tk.W)
-        self.spotify_url_var = tk.StringVar()
-        spotify_entry = ttk.Entry(playlist_frame, textvariable=self.spotify_url_var, width=80)
-        spotify_entry.pack(fill=tk.X, pady=5)
+        self.spotify_url_entry = ttk.Entry(playlist_frame, width=80)
+        self.spotify_url_entry.pack(fill=tk.X, pady=5)
         
         spotify_buttons = ttk.Frame(playlist_frame)
         spotify_buttons.pack(fill=tk.X, pady=5)
@@ -210,19 +397,17 @@ class YouTubeDownloaderGUI:
             self.spotify_tree.heading(col, text=col)
             self.spotify_tree.column(col, width=150)
         
-        spotify_scroll_y = ttk.Scrollbar(tracks_frame, orient=tk.VERTICAL, command=self.spotify_tree.yview)
+        spotify_scroll_y = ttk.Scrollbar(tracks_frame, orient=tk.VERTICAL)
         spotify_scroll_x = ttk.Scrollbar(tracks_frame, orient=tk.HORIZONTAL, command=self.spotify_tree.xview)
-        self.spotify_tree.configure(yscrollcommand=spotify_scroll_y.set, xscrollcommand=spotify_scroll_x.set)
+        self.spotify_tree.configure(xscrollcommand=spotify_scroll_x.set)
+        self.spotify_view = VirtualTreeview(self.spotify_tree, spotify_scroll_y)
         
         self.spotify_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         spotify_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         spotify_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
         
-    def create_batch_tab(self):
+    def create_batch_tab(self, batch_frame):
         """Create the batch processing tab."""
-        batch_frame = ttk.Frame(self.notebook)
-        self.notebook.add(batch_frame, text="Batch")
-        
         # File input
         file_frame = ttk.LabelFrame(batch_frame, text="Batch File Input", padding=10)
         file_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -230,8 +415,8 @@ class YouTubeDownloaderGUI:
         file_input_frame = ttk.Frame(file_frame)
         file_input_frame.pack(fill=tk.X, pady=5)
         
-        self.batch_file_var = tk.StringVar()
-        ttk.Entry(file_input_frame, textvariable=self.batch_file_var, width=60).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.batch_file_entry = ttk.Entry(file_input_frame, width=60)
+        self.batch_file_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
         ttk.Button(file_input_frame, text="Browse", command=self.browse_batch_file).pack(side=tk.RIGHT, padx=(5, 0))
         
         ttk.Button(file_frame, text="Load from File", command=self.load_batch_file).pack(pady=5)
@@ -248,18 +433,15 @@ class YouTubeDownloaderGUI:
         batch_buttons.pack(fill=tk.X, pady=5)
         
         ttk.Label(batch_buttons, text="Media Type:").pack(side=tk.LEFT)
-        self.batch_media_var = tk.StringVar(value="audio")
+        self.batch_media_var = tk.StringVar(value=self._default_media_type)
         ttk.Radiobutton(batch_buttons, text="Audio", variable=self.batch_media_var, value="audio").pack(side=tk.LEFT, padx=5)
         ttk.Radiobutton(batch_buttons, text="Video", variable=self.batch_media_var, value="video").pack(side=tk.LEFT, padx=5)
         
         ttk.Button(batch_buttons, text="Add to Queue", command=self.add_batch_to_queue).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(batch_buttons, text="Clear", command=lambda: self.batch_text.delete(1.0, tk.END)).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(batch_buttons, text="Clear", command=self.clear_batch_input).pack(side=tk.RIGHT, padx=5)
         
-    def create_queue_tab(self):
+    def create_queue_tab(self, queue_frame):
         """Create the download queue management tab."""
-        queue_frame = ttk.Frame(self.notebook)
-        self.notebook.add(queue_frame, text="Queue")
-        
         # Queue controls
         controls_frame = ttk.Frame(queue_frame)
         controls_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -289,19 +471,18 @@ class YouTubeDownloaderGUI:
             self.queue_tree.heading(col, text=col)
             self.queue_tree.column(col, width=150)
         
-        queue_scroll_y = ttk.Scrollbar(queue_display_frame, orient=tk.VERTICAL, command=self.queue_tree.yview)
+        queue_scroll_y = ttk.Scrollbar(queue_display_frame, orient=tk.VERTICAL)
         queue_scroll_x = ttk.Scrollbar(queue_display_frame, orient=tk.HORIZONTAL, command=self.queue_tree.xview)
-        self.queue_tree.configure(yscrollcommand=queue_scroll_y.set, xscrollcommand=queue_scroll_x.set)
+        self.queue_tree.configure(xscrollcommand=queue_scroll_x.set)
+        self.queue_view = VirtualTreeview(self.queue_tree, queue_scroll_y)
+        self.update_queue_display()
         
         self.queue_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         queue_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         queue_scroll_x.pack(side=tk.BOTTOM, fill=tk.X)
         
-    def create_logs_tab(self):
+    def create_logs_tab(self, logs_frame):
         """Create the logs and debugging tab."""
-        logs_frame = ttk.Frame(self.notebook)
-        self.notebook.add(logs_frame, text="Logs")
-        
         # Log display
         self.log_text = scrolledtext.ScrolledText(logs_frame, height=25, width=100)
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -314,11 +495,20 @@ class YouTubeDownloaderGUI:
         ttk.Button(log_controls, text="Save Logs", command=self.save_logs).pack(side=tk.LEFT, padx=5)
         ttk.Button(log_controls, text="Refresh", command=self.refresh_logs).pack(side=tk.RIGHT, padx=5)
         
+    def _on_default_media_changed(self, *args):
+        """Cache the Settings media type; tabs built afterwards start with it selected."""
+        self._default_media_type = self.media_type_var.get()
+        
+    def _set_entry(self, entry: ttk.Entry, value: str):
+        """Replace the text of an entry field."""
+        entry.delete(0, tk.END)
+        entry.insert(0, value)
+        
     def browse_download_path(self):
         """Browse for download directory."""
-        path = filedialog.askdirectory(initialdir=self.download_path_var.get())
+        path = filedialog.askdirectory(initialdir=self.download_path_entry.get())
         if path:
-            self.download_path_var.set(path)
+            self._set_entry(self.download_path_entry, path)
             
     def browse_batch_file(self):
         """Browse for batch input file."""
@@ -327,21 +517,24 @@ class YouTubeDownloaderGUI:
             filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
         )
         if file_path:
-            self.batch_file_var.set(file_path)
+            self._set_entry(self.batch_file_entry, file_path)
             
     def save_settings(self):
         """Save current settings to file."""
         settings = {
-            "youtube_api_key": self.youtube_api_var.get(),
-            "spotify_client_id": self.spotify_id_var.get(),
-            "spotify_client_secret": self.spotify_secret_var.get(),
-            "download_path": self.download_path_var.get(),
+            "youtube_api_key": self.youtube_api_entry.get(),
+            "spotify_client_id": self.spotify_id_entry.get(),
+            "spotify_client_secret": self.spotify_secret_entry.get(),
+            "download_path": self.download_path_entry.get(),
             "default_media_type": self.media_type_var.get()
         }
         
         try:
-            with open("settings.json", "w") as f:
-                json.dump(settings, f, indent=2)
+            data = dumps_json(settings, indent=True)
+            with open("settings.json", "wb") as f:
+                f.write(data)
+            self._settings_cache = settings
+            self._settings_mtime = os.stat("settings.json").st_mtime
             messagebox.showinfo("Success", "Settings saved successfully!")
             self.initialize_downloaders()
         except Exception as e:
@@ -350,34 +543,50 @@ class YouTubeDownloaderGUI:
     def load_settings(self):
         """Load settings from file."""
         try:
-            if os.path.exists("settings.json"):
-                with open("settings.json", "r") as f:
-                    settings = json.load(f)
-                
-                self.youtube_api_var.set(settings.get("youtube_api_key", ""))
-                self.spotify_id_var.set(settings.get("spotify_client_id", ""))
-                self.spotify_secret_var.set(settings.get("spotify_client_secret", ""))
-                self.download_path_var.set(settings.get("download_path", str(Path.home() / "Downloads" / "YouTube")))
+            settings = self._read_settings()
+            if settings is not None:
+                self._set_entry(self.youtube_api_entry, settings.get("youtube_api_key", ""))
+                self._set_entry(self.spotify_id_entry, settings.get("spotify_client_id", ""))
+                self._set_entry(self.spotify_secret_entry, settings.get("spotify_client_secret", ""))
+                self._set_entry(self.download_path_entry, settings.get("download_path", DEFAULT_DOWNLOAD_PATH))
                 self.media_type_var.set(settings.get("default_media_type", "audio"))
                 
                 self.initialize_downloaders()
         except Exception as e:
             self.logger.error(f"Failed to load settings: {e}")
             
+    def _read_settings(self) -> Optional[Dict]:
+        """Return the parsed settings.json, re-reading it only when its mtime has changed."""
+        # One stat() both checks that the file exists and gives the mtime
+        try:
+            mtime = os.stat("settings.json").st_mtime
+        except FileNotFoundError:
+            return None
+        if self._settings_cache is None or mtime != self._settings_mtime:
+            with open("settings.json", "rb") as f:
+                data = f.read()
+            self._settings_cache = loads_json(data)
+            self._settings_mtime = mtime
+        return self._settings_cache
+            
     def initialize_downloaders(self):
         """Initialize downloader instances with current settings."""
         try:
-            if self.youtube_api_var.get():
+            if self.youtube_api_entry.get():
+                # A queue run still in progress keeps using the old instance and closes it when done
+                if self.downloader and not self.is_downloading:
+                    self.downloader.close()
                 self.downloader = YouTubeDownloaderEnhanced(
-                    self.youtube_api_var.get(),
-                    self.download_path_var.get()
+                    self.youtube_api_entry.get(),
+                    self.download_path_entry.get(),
+                    max_parallel=DOWNLOAD_WORKERS
                 )
                 
-            if self.spotify_id_var.get() and self.spotify_secret_var.get() and self.youtube_api_var.get():
+            if self.spotify_id_entry.get() and self.spotify_secret_entry.get() and self.youtube_api_entry.get():
                 self.spotify_converter = SpotifyToYouTubeConverter(
-                    self.spotify_id_var.get(),
-                    self.spotify_secret_var.get(),
-                    self.youtube_api_var.get()
+                    self.spotify_id_entry.get(),
+                    self.spotify_secret_entry.get(),
+                    self.youtube_api_entry.get()
                 )
         except Exception as e:
             self.logger.error(f"Failed to initialize downloaders: {e}")
@@ -454,7 +663,7 @@ API Keys Required:
             messagebox.showerror("Error", "Please configure YouTube API key first!")
             return
             
-        url_or_query = self.url_var.get().strip()
+        url_or_query = self.url_entry.get().strip()
         if not url_or_query:
             messagebox.showwarning("Warning", "Please enter a URL or search query!")
             return
@@ -462,7 +671,7 @@ API Keys Required:
         try:
             self.downloader.add_to_queue([url_or_query], self.single_media_var.get())
             self.update_queue_display()
-            self.url_var.set("")
+            self._set_entry(self.url_entry, "")
             messagebox.showinfo("Success", "Added to download queue!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to add to queue: {e}")
@@ -478,17 +687,51 @@ API Keys Required:
             messagebox.showerror("Error", "Please configure Spotify API credentials first!")
             return
             
-        playlist_url = self.spotify_url_var.get().strip()
+        playlist_url = self.spotify_url_entry.get().strip()
         if not playlist_url:
             messagebox.showwarning("Warning", "Please enter a Spotify playlist URL!")
             return
             
+        # Show each page of tracks as it arrives instead of waiting for the whole playlist
+        self.spotify_converter.tracks = []
+        self.update_spotify_display([])
+        self._playlist_load = load = object()
+        threading.Thread(target=self._fetch_playlist_pages, args=(playlist_url, load), daemon=True).start()
+        
+    def _fetch_playlist_pages(self, playlist_url, load):
+        """Fetch playlist pages in a background thread, handing each one to the UI as it arrives."""
         try:
-            tracks = self.spotify_converter.get_playlist_tracks(playlist_url)
-            self.update_spotify_display(tracks)
-            messagebox.showinfo("Success", f"Loaded {len(tracks)} tracks from playlist!")
+            # closing() shuts the page fetcher down on this thread if the load is abandoned
+            with closing(self.spotify_converter.iter_playlist_tracks(playlist_url)) as pages:
+                for page in pages:
+                    if load is not self._playlist_load:
+                        return
+                    self.root.after(0, self._add_playlist_page, load, page)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load playlist: {e}")
+            self.logger.error(f"Error fetching Spotify playlist tracks: {e}")
+            self.root.after(0, self._finish_playlist_load, load, e)
+        else:
+            self.root.after(0, self._finish_playlist_load, load, None)
+            
+    def _add_playlist_page(self, load, page):
+        """Append one page of playlist tracks to the table."""
+        if load is not self._playlist_load:
+            # A newer playlist load replaced this one
+            return
+        self.spotify_converter.tracks.extend(page)
+        self.spotify_view.append_rows(self._spotify_rows(page))
+        
+    def _finish_playlist_load(self, load, error):
+        """Report the outcome of a playlist load once its last page has been added."""
+        if load is not self._playlist_load:
+            return
+        self._playlist_load = None
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to load playlist: {error}")
+            return
+        tracks = self.spotify_converter.tracks
+        self.logger.info(f"Found {len(tracks)} tracks in Spotify playlist.")
+        messagebox.showinfo("Success", f"Loaded {len(tracks)} tracks from playlist!")
             
     def convert_spotify_to_youtube(self):
         """Convert Spotify tracks to YouTube URLs."""
@@ -510,32 +753,54 @@ API Keys Required:
         
     def load_batch_file(self):
         """Load URLs from batch file."""
-        file_path = self.batch_file_var.get()
+        file_path = self.batch_file_entry.get()
         if not file_path or not os.path.exists(file_path):
             messagebox.showerror("Error", "Please select a valid batch file!")
             return
             
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            self.batch_text.delete(1.0, tk.END)
-            self.batch_text.insert(1.0, content)
+            self.clear_batch_input()
+            if os.path.getsize(file_path) > BATCH_PREVIEW_BYTES:
+                # Map large files instead of copying them into Python and Tk; show only the start
+                with open(file_path, 'rb') as f:
+                    self._batch_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                cut = self._batch_mmap.rfind(b'\n', 0, BATCH_PREVIEW_BYTES)
+                preview = self._batch_mmap[:cut if cut > 0 else BATCH_PREVIEW_BYTES]
+                self.batch_text.insert(1.0, preview.decode('utf-8', 'replace').replace('\r\n', '\n'))
+                self.batch_text.insert(tk.END, f"\n... (preview only: every line of {os.path.basename(file_path)} will be queued)")
+                self.batch_text.config(state=tk.DISABLED)
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                self.batch_text.insert(1.0, content)
             messagebox.showinfo("Success", "Batch file loaded!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load batch file: {e}")
             
+    def clear_batch_input(self):
+        """Clear the batch text box and release any large batch file loaded into it."""
+        if self._batch_mmap is not None:
+            self._batch_mmap.close()
+            self._batch_mmap = None
+        self.batch_text.config(state=tk.NORMAL)
+        self.batch_text.delete(1.0, tk.END)
+        
     def add_batch_to_queue(self):
         """Add batch items to download queue."""
         if not self.downloader:
             messagebox.showerror("Error", "Please configure YouTube API key first!")
             return
             
-        content = self.batch_text.get(1.0, tk.END).strip()
-        if not content:
+        if self._batch_mmap is not None:
+            # Read the mapped file line by line rather than the preview in the text box
+            self._batch_mmap.seek(0)
+            lines = (raw.decode('utf-8', 'replace').strip() for raw in iter(self._batch_mmap.readline, b''))
+        else:
+            lines = (line.strip() for line in self.batch_text.get(1.0, tk.END).split('\n'))
+        items = [line for line in lines if line]
+        if not items:
             messagebox.showwarning("Warning", "Please enter URLs or queries!")
             return
-            
-        items = [line.strip() for line in content.split('\n') if line.strip()]
         
         try:
             self.downloader.add_to_queue(items, self.batch_media_var.get())
@@ -555,29 +820,57 @@ API Keys Required:
             return
             
         self.is_downloading = True
+        self._stop_event.clear()
         threading.Thread(target=self.process_downloads, daemon=True).start()
         
     def process_downloads(self):
         """Process downloads in background thread."""
+        downloader = self.downloader
         try:
             def progress_callback(current, total, item):
-                progress = (current / total) * 100
-                self.root.after(0, lambda: self.progress_var.set(progress))
-                self.root.after(0, lambda: self.status_var.set(f"Processing {current}/{total}: {item[:50]}..."))
+                # Ticks that arrive before the UI catches up only replace the state to draw
+                with self._progress_lock:
+                    self._progress_state = (current, total, item)
+                    if self._progress_pending:
+                        return
+                    self._progress_pending = True
+                self.root.after_idle(self._flush_progress)
                 
-            results = self.downloader.process_queue(progress_callback)
+            def item_callback(item):
+                # Picked up by the progress flush that the following progress_callback schedules
+                with self._progress_lock:
+                    self._finished_items.append(item)
+                
+            results = downloader.process_queue(progress_callback, stop_event=self._stop_event,
+                                               item_callback=item_callback)
             
-            self.root.after(0, lambda: self.status_var.set(f"Completed: {results['completed']}, Failed: {results['failed']}"))
-            self.root.after(0, self.update_queue_display)
+            # Idle callbacks run in order, so this lands after any progress update still pending
+            prefix = "Paused - " if self._stop_event.is_set() else ""
+            self.root.after_idle(lambda: self.status_var.set(f"{prefix}Completed: {results['completed']}, Failed: {results['failed']}"))
             
         except Exception as e:
             self.root.after(0, lambda: messagebox.showerror("Error", f"Download failed: {e}"))
         finally:
             self.is_downloading = False
-            
+            # Settings were saved during the run and replaced this downloader
+            if downloader is not self.downloader:
+                downloader.close()
+            
+    def _flush_progress(self):
+        """Draw the most recent progress reported by the download thread."""
+        with self._progress_lock:
+            current, total, item = self._progress_state
+            finished, self._finished_items = self._finished_items, []
+            self._progress_pending = False
+        self.progress_var.set((current / total) * 100)
+        self.status_var.set(f"Finished {current}/{total}: {item[:50]}...")
+        for finished_item in finished:
+            self.update_queue_row(finished_item)
+        
     def pause_downloads(self):
         """Pause downloads."""
-        self.is_downloading = False
+        # Downloads already running finish; the rest stay pending for the next start
+        self._stop_event.set()
         self.status_var.set("Paused")
         
     def clear_queue(self):
@@ -608,38 +901,30 @@ API Keys Required:
                 
     def update_queue_display(self):
         """Update the queue display tree."""
-        if not self.downloader:
+        if not self.downloader or self.queue_view is None:
             return
             
-        # Clear existing items
-        for item in self.queue_tree.get_children():
-            self.queue_tree.delete(item)
-            
-        # Add current queue items
-        for item in self.downloader.download_queue:
-            self.queue_tree.insert("", tk.END, values=(
-                item.url_or_query[:50] + "..." if len(item.url_or_query) > 50 else item.url_or_query,
-                item.media_type,
-                item.status,
-                "",  # Progress placeholder
-                item.file_path[:50] + "..." if len(item.file_path) > 50 else item.file_path
-            ))
+        # Only the rows in view become Treeview items
+        download_queue = self.downloader.download_queue
+        self._queue_row_index = {id(item): index for index, item in enumerate(download_queue)}
+        self.queue_view.set_rows(list(map(_queue_row, download_queue)))
+        
+    def update_queue_row(self, item: DownloadItem):
+        """Redraw the queue table row of a single item."""
+        index = self._queue_row_index.get(id(item))
+        if index is not None and self.queue_view is not None:
+            self.queue_view.update_row(index, _queue_row(item))
             
     def update_spotify_display(self, tracks):
         """Update the Spotify tracks display."""
-        # Clear existing items
-        for item in self.spotify_tree.get_children():
-            self.spotify_tree.delete(item)
-            
-        # Add tracks
-        for track in tracks:
-            self.spotify_tree.insert("", tk.END, values=(
-                track.title[:30] + "..." if len(track.title) > 30 else track.title,
-                track.artist[:20] + "..." if len(track.artist) > 20 else track.artist,
-                track.album[:20] + "..." if len(track.album) > 20 else track.album,
-                track.youtube_url[:40] + "..." if track.youtube_url and len(track.youtube_url) > 40 else track.youtube_url or "",
-                track.verification_status
-            ))
+        # Only the rows in view become Treeview items
+        self.spotify_view.set_rows(self._spotify_rows(tracks))
+        
+    def _spotify_rows(self, tracks) -> List[tuple]:
+        """Build the Spotify table rows for a list of tracks."""
+        clip = _clip
+        return [(clip(title, 30), clip(artist, 20), clip(album, 20), clip(youtube_url or "", 40), status)
+                for title, artist, album, youtube_url, status in map(_TRACK_FIELDS, tracks)]
             
     def add_selected_search_result(self):
         """Add selected search result to queue."""
@@ -670,11 +955,21 @@ API Keys Required:
     def refresh_logs(self):
         """Refresh logs display."""
         try:
-            if os.path.exists("yt_downloader_gui.log"):
-                with open("yt_downloader_gui.log", 'r', encoding='utf-8') as f:
-                    content = f.read()
-                self.log_text.delete(1.0, tk.END)
-                self.log_text.insert(1.0, content)
+            # Append only what was written since the last refresh, like tail -f
+            try:
+                f = open("yt_downloader_gui.log", 'rb')
+            except FileNotFoundError:
+                return
+            with f:
+                if os.fstat(f.fileno()).st_size < self._log_tail_pos:
+                    # The file was truncated or replaced, so start over
+                    self._log_tail_pos = 0
+                    self.log_text.delete(1.0, tk.END)
+                f.seek(self._log_tail_pos)
+                chunk = f.read()
+                self._log_tail_pos = f.tell()
+            if chunk:
+                self.log_text.insert(tk.END, chunk.decode('utf-8', 'replace').replace('\r\n', '\n'))
                 self.log_text.see(tk.END)
         except Exception as e:
             self.logger.error(f"Failed to refresh logs: {e}")
@@ -683,7 +978,13 @@ def main():
     """Main function to run the GUI application."""
     root = tk.Tk()
     app = YouTubeDownloaderGUI(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        if app.downloader:
+            app.downloader.close()
+        # Flush any records still queued for the log files
+        app.log_listener.stop()
 
 if __name__ == "__main__":
     main()